@@ -0,0 +1,204 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from app.telemetry import meter, LATENCY_BUCKETS
+
+# =========================================================
+# Admission control for the LLM pipeline.
+# Each /api/chat request costs ~6 LLM calls, so we cap how many run at once
+# and queue a bounded number behind them. Anything beyond that is turned away
+# immediately with Retry-After, instead of piling up provider 429s and timeouts.
+# =========================================================
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "4"))        # Pipelines running at once
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "16"))                  # Requests allowed to wait for a slot
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "30"))        # Seconds a request may wait before a 503
+CHAT_MAX_SESSION_PENDING = int(os.getenv("CHAT_MAX_SESSION_PENDING", "2"))  # Queued + running requests per session_id
+
+queue_depth = meter.create_up_down_counter(
+    "chanakya_admission_queue_depth", unit="{pipeline}",
+    description="Pipeline slots requested by callers still waiting (for slots, or for their session's previous request)",
+)
+in_flight_gauge = meter.create_up_down_counter(
+    "chanakya_admission_in_flight", unit="{pipeline}",
+    description="Pipeline slots currently held",
+)
+wait_time = meter.create_histogram(
+    "chanakya_admission_wait", unit="s",
+    description="Time between arrival and the start of processing",
+    explicit_bucket_boundaries_advisory=LATENCY_BUCKETS,
+)
+rejections = meter.create_counter(
+    "chanakya_admission_rejected", unit="{request}",
+    description="Requests turned away, by reason",
+)
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing. The route turns it into a 429/503 with Retry-After."""
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class WeightedSlots:
+    """
+    A semaphore whose acquire(n) takes n slots in one go, strictly first come first served,
+    so a batch that needs several slots is neither starved by single requests nor left holding
+    half of what it needs (which could wedge two batches against each other).
+    """
+    def __init__(self, total: int):
+        self.free = total
+        self._waiters = deque()   # (n, future)
+
+    async def acquire(self, n: int = 1):
+        if not self._waiters and self.free >= n:
+            self.free -= n
+            return
+        future = asyncio.get_running_loop().create_future()
+        waiter = (n, future)
+        self._waiters.append(waiter)
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release(n)     # Granted just as we gave up: hand the slots on
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                self._wake()        # We may have been the head blocking smaller requests
+            raise
+
+    def release(self, n: int = 1):
+        self.free += n
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._waiters[0][0] <= self.free:
+            n, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.free -= n
+            future.set_result(None)
+
+
+class AdmissionController:
+    """
+    Two guarantees for the chat pipeline:
+      1. Per-session ordering: requests with the same session_id run one at a time, in arrival
+         order (asyncio.Lock wakes waiters FIFO), so they can't race on the shared history.
+      2. Global backpressure: at most `max_concurrent` pipelines run; at most `max_queue` wait.
+    A caller that runs several pipelines at once (/api/chat/batch) admits itself with slots=N,
+    so the limits count pipelines, not HTTP requests. Counters below are in slots.
+    Lives on the event loop, so the counters need no locks.
+    """
+    def __init__(self, name: str = "chat", max_concurrent: int = CHAT_MAX_CONCURRENT, max_queue: int = CHAT_MAX_QUEUE,
+                 queue_timeout: float = CHAT_QUEUE_TIMEOUT, max_session_pending: int = CHAT_MAX_SESSION_PENDING):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_session_pending = max_session_pending
+        self._slots = WeightedSlots(max_concurrent)
+        self._sessions: Dict[str, List] = {}   # session_id -> [asyncio.Lock, pending_count]
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_service_seconds = 5.0         # EWMA, seeds the Retry-After estimate
+        self._labels = {"queue": name}
+
+    def retry_after(self) -> int:
+        # Roughly when a queue slot frees up: everyone ahead of us, drained max_concurrent at a time
+        backlog = (self.waiting + 1) / max(1, self.max_concurrent)
+        return max(1, int(backlog * self.avg_service_seconds + 0.5))
+
+    def _reject(self, status_code: int, reason: str):
+        self.rejected += 1
+        rejections.add(1, {**self._labels, "reason": reason})
+        raise Overloaded(status_code, reason, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, session_id: Optional[str], slots: int = 1, rounds: int = 1):
+        """
+        session_id=None skips per-session ordering. `slots` pipeline slots are held for the whole block
+        (capped at max_concurrent); `rounds` is how many pipeline durations the block lasts, so the
+        Retry-After estimate stays per pipeline.
+        """
+        slots = max(1, min(slots, self.max_concurrent))
+        entry = self._sessions.get(session_id) if session_id is not None else None
+        if entry is not None and entry[1] >= self.max_session_pending:
+            # One client hammering its own session: that's on them, hence 429 rather than 503
+            self._reject(429, "session_busy")
+        if self.in_flight + self.waiting + slots > self.max_concurrent + self.max_queue:
+            self._reject(503, "queue_full")
+
+        if session_id is not None:
+            if entry is None:
+                entry = self._sessions[session_id] = [asyncio.Lock(), 0]
+            entry[1] += 1
+        arrived = time.perf_counter()
+        self.waiting += slots
+        queue_depth.add(slots, self._labels)
+        session_locked = slot_taken = False
+        try:
+            try:
+                # Session first: a request queued behind its own session never holds a global slot
+                if entry is not None:
+                    await asyncio.wait_for(entry[0].acquire(), timeout=self.queue_timeout)
+                    session_locked = True
+                remaining = self.queue_timeout - (time.perf_counter() - arrived)
+                await asyncio.wait_for(self._slots.acquire(slots), timeout=max(0.0, remaining))
+                slot_taken = True
+            except asyncio.TimeoutError:
+                self._reject(503, "queue_timeout")
+            finally:
+                self.waiting -= slots
+                queue_depth.add(-slots, self._labels)
+
+            started = time.perf_counter()
+            wait_time.record(started - arrived, self._labels)
+            self.in_flight += slots
+            self.admitted += 1
+            in_flight_gauge.add(slots, self._labels)
+            try:
+                yield
+            finally:
+                self.in_flight -= slots
+                in_flight_gauge.add(-slots, self._labels)
+                service = (time.perf_counter() - started) / max(1, rounds)
+                self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * service
+        finally:
+            if slot_taken:
+                self._slots.release(slots)
+            if session_locked:
+                entry[0].release()
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "queue": self.name,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "active_sessions": len(self._sessions),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_service_seconds": round(self.avg_service_seconds, 3),
+            "retry_after": self.retry_after(),
+        }
+
+
+# Singleton guarding /api/chat and /api/chat/batch
+chat_admission = AdmissionController()
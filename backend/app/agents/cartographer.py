@@ -1,13 +1,16 @@
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 import json
+import logging
+from app.telemetry import traced_call
+from app.providers import make_llm
+
+logger = logging.getLogger(__name__)
 
 class CartographerAgent:
     def __init__(self):
-        self.llm = ChatGroq(
-            model_name="llama-3.1-8b-instant"
-        )
+        self.llm = make_llm("cartographer")
     
+    @traced_call("cartographer", "extract_locations")
     def extract_locations(self,text:str):
         """
         Uses an LLM to extract the locations from the text.
@@ -21,7 +24,7 @@ class CartographerAgent:
         Typos/Formatting: LLMs are extremely forgiving. If you misspell "Afghanistan," a list-lookup would fail, but Llama will still probably figure it out.
         Simplicity: Instead of downloading a massive database of 100,000 cities, we just ask the LLM (which we are already paying for/using) to do the "hard work" of reading for us.
         """
-        print(f"🗺️ [CARTOGRAPHER] Scanning for locations in: '{text[:50]}...'")
+        logger.info(f"🗺️ [CARTOGRAPHER] Scanning for locations in: '{text[:50]}...'")
 
         system_prompt = """
             You are a geospatial intelligence extractor. 
@@ -46,5 +49,5 @@ class CartographerAgent:
             locations = json.loads(response.content.strip())
             return locations
         except Exception as e:
-            print(f"❌ [CARTOGRAPHER] Error extracting locations: {e}")
+            logger.error(f"❌ [CARTOGRAPHER] Error extracting locations: {e}")
             return []
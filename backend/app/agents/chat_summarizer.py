@@ -1,6 +1,10 @@
-from langchain_groq import ChatGroq
 from pydantic import BaseModel, Field, ValidationError
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+import logging
+from app.telemetry import traced_call
+from app.providers import make_llm
+
+logger = logging.getLogger(__name__)
 
 class MessageItem(BaseModel):
     """Strongly-typed Pydantic schema for a single chat message.
@@ -14,10 +18,11 @@ class SummarizerOutput(BaseModel):
 
 class ChatSummarizer:
     def __init__(self):
-        self.llm = ChatGroq(model_name="llama-3.1-8b-instant")
+        self.llm = make_llm("chat_summarizer")
 
+    @traced_call("chat_summarizer", "summarize")
     def summarize(self,history:MessageItem):
-        print(f"🧠 [CHAT SUMMARIZER] Summarizing context for chat...")
+        logger.info(f"🧠 [CHAT SUMMARIZER] Summarizing context for chat...")
         system_prompt = """
         You are a Senior Strategic Analyst for the Indian Armed Forces.
         You will be given the converstation history of a user with Chanakya.
@@ -42,8 +47,8 @@ class ChatSummarizer:
             validated = SummarizerOutput(**raw_response)
             return validated.model_dump()
         except ValidationError as e:
-            print(f"❌ [CHAT SUMMARIZER] Pydantic Validation Error: {e}")
+            logger.error(f"❌ [CHAT SUMMARIZER] Pydantic Validation Error: {e}")
             return {"summary": ""}
         except Exception as e:
-            print(f"❌ [CHAT SUMMARIZER] Generation Error: {e}")
+            logger.error(f"❌ [CHAT SUMMARIZER] Generation Error: {e}")
             return {"summary": ""}
\ No newline at end of file
@@ -1,8 +1,12 @@
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field, ValidationError
 from typing import List
 import json
+import logging
+from app.telemetry import traced_call
+from app.providers import make_llm
+
+logger = logging.getLogger(__name__)
 
 class ExtractedEntities(BaseModel):
     people: List[str] = Field(default_factory=list, description="List of individual people mentioned.")
@@ -11,10 +15,11 @@ class ExtractedEntities(BaseModel):
 
 class EntityExtractorAgent:
     def __init__(self):
-        self.llm = ChatGroq(model_name="llama-3.1-8b-instant")
+        self.llm = make_llm("entity_extractor")
         
+    @traced_call("entity_extractor", "extract")
     def extract(self, text: str) -> dict:
-        print(f"🧠 [ANALYST] Extracting structured entities (People, Orgs, Countries)...")
+        logger.info(f"🧠 [ANALYST] Extracting structured entities (People, Orgs, Countries)...")
         
         system_prompt = """
         You are an elite intelligence analyst. Extract all critical entities from the provided briefing text.
@@ -47,8 +52,8 @@ class EntityExtractorAgent:
             return validated.model_dump()
             
         except ValidationError as e:
-            print(f"❌ [ANALYST] Pydantic Validation Error: LLM returned malformed schema. {e}")
+            logger.error(f"❌ [ANALYST] Pydantic Validation Error: LLM returned malformed schema. {e}")
             return {"people": [], "organizations": [], "countries": []}
         except Exception as e:
-            print(f"❌ [ANALYST] Generation Error: {e}")
+            logger.error(f"❌ [ANALYST] Generation Error: {e}")
             return {"people": [], "organizations": [], "countries": []}
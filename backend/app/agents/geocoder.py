@@ -0,0 +1,149 @@
+import time
+import logging
+import threading
+import requests
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from app.telemetry import traced_call
+
+logger = logging.getLogger(__name__)
+
+class GeocoderUnavailable(Exception):
+    """No answer at all (timeout, HTTP error, DNS...), as opposed to "this name has no coordinates"."""
+
+
+class GeocodeResult(BaseModel):
+    canonical_name: str
+    latitude: float
+    longitude: float
+
+# =========================================================
+# Resolvers: anything with a .resolve(name) method works.
+# The GeocoderAgent does not care WHERE coordinates come from,
+# so tests and benchmarks can swap in a StaticResolver and never touch the network.
+# =========================================================
+
+class NominatimResolver:
+    """
+    OpenStreetMap Nominatim. Good for countries like 'USA'.
+    Their usage policy allows at most 1 request per second, so we throttle ourselves.
+    """
+    URL = "https://nominatim.openstreetmap.org/search"
+
+    def __init__(self, email: str = "admin@projectchanakya.com", min_interval: float = 1.0, timeout: float = 5.0):
+        self.email = email
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._last_call = 0.0
+
+    def _throttle(self):
+        # The lock makes concurrent callers (API thread + scheduler thread) queue up instead of bursting.
+        with self._lock:
+            wait = self.min_interval - (time.monotonic() - self._last_call)
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+
+    def resolve(self, name: str) -> Optional[GeocodeResult]:
+        self._throttle()
+        res = self.session.get(
+            self.URL,
+            params={"format": "json", "q": name, "limit": 1, "email": self.email},
+            timeout=self.timeout
+        )
+        res.raise_for_status()
+        data = res.json()
+        if not data:
+            return None
+        return GeocodeResult(
+            canonical_name=data[0].get("display_name", name),
+            latitude=float(data[0]["lat"]),
+            longitude=float(data[0]["lon"])
+        )
+
+class OpenMeteoResolver:
+    """
+    Open-Meteo geocoding. Good fallback for cities and regions.
+    """
+    URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def resolve(self, name: str) -> Optional[GeocodeResult]:
+        res = self.session.get(self.URL, params={"name": name, "count": 1, "format": "json"}, timeout=self.timeout)
+        res.raise_for_status()
+        results = res.json().get("results") or []
+        if not results:
+            return None
+        top = results[0]
+        return GeocodeResult(
+            canonical_name=", ".join(p for p in [top.get("name"), top.get("country")] if p) or name,
+            latitude=float(top["latitude"]),
+            longitude=float(top["longitude"])
+        )
+
+class ChainResolver:
+    """
+    Tries each resolver in order and returns the first hit (same order the frontend used to use).
+    None means every resolver answered "not found"; if any of them failed instead,
+    the name may still exist, so GeocoderUnavailable is raised rather than a miss.
+    """
+    def __init__(self, resolvers: List):
+        self.resolvers = resolvers
+
+    def resolve(self, name: str) -> Optional[GeocodeResult]:
+        failures = []
+        for resolver in self.resolvers:
+            try:
+                result = resolver.resolve(name)
+                if result:
+                    return result
+            except Exception as e:
+                logger.warning(f"⚠️ [GEOCODER] {type(resolver).__name__} failed for '{name}', trying fallback... {e}")
+                failures.append(f"{type(resolver).__name__}: {e}")
+        if failures:
+            raise GeocoderUnavailable("; ".join(failures))
+        return None
+
+class StaticResolver:
+    """
+    Local stand-in for tests and offline runs: {"Paris": (48.85, 2.35)}.
+    """
+    def __init__(self, table: Dict[str, tuple]):
+        self.table = {k.lower(): v for k, v in table.items()}
+
+    def resolve(self, name: str) -> Optional[GeocodeResult]:
+        hit = self.table.get(name.lower())
+        if not hit:
+            return None
+        return GeocodeResult(canonical_name=name, latitude=hit[0], longitude=hit[1])
+
+class GeocoderAgent:
+    """
+    Turns location names into coordinates on the BACKEND, once per name.
+    The result is cached on the Location row, so the map never geocodes in the browser again.
+    """
+    def __init__(self, resolver=None):
+        self.resolver = resolver or ChainResolver([NominatimResolver(), OpenMeteoResolver()])
+
+    def set_resolver(self, resolver):
+        self.resolver = resolver
+
+    @traced_call("geocoder", "geocode")
+    def geocode(self, name: str) -> Optional[GeocodeResult]:
+        """
+        None = the name has no coordinates. Raises GeocoderUnavailable when no resolver could answer,
+        so the caller can retry later instead of caching a miss.
+        """
+        logger.info(f"🛰️ [GEOCODER] Resolving coordinates for: '{name}'")
+        try:
+            return self.resolver.resolve(name)
+        except GeocoderUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"❌ [GEOCODER] Error resolving '{name}': {e}")
+            raise GeocoderUnavailable(str(e)) from e
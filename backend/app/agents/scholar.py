@@ -1,9 +1,13 @@
 import os
-from typing import List
+import logging
+from typing import List, Optional
 from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from app.telemetry import traced_call
+from app.providers import make_embeddings, embeddings_are_symmetric
+
+logger = logging.getLogger(__name__)
 
 class ScholarAgent:
     """
@@ -14,8 +18,9 @@ class ScholarAgent:
     def __init__(self, persist_directory: str = "./data/chroma_db"):
         self.persist_directory = persist_directory
         
-        # Switched to Free Local Embeddings (runs on your Mac's CPU/GPU)
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        # Free Local Embeddings by default (see app/providers.py)
+        self.embeddings = make_embeddings()
+        self.symmetric_embeddings = embeddings_are_symmetric()
         
         # Initialize Vector DB
         if os.path.exists(persist_directory):
@@ -26,11 +31,12 @@ class ScholarAgent:
         else:
             self.vector_store = None
 
+    @traced_call("scholar", "ingest")
     def ingest_documents(self, source_directory: str):
         """
         Reads all PDFs from a folder and memorizes them.
         """
-        print(f"📚 [SCHOLAR] Reading documents from {source_directory}...")
+        logger.info(f"📚 [SCHOLAR] Reading documents from {source_directory}...")
         
         loader = DirectoryLoader(source_directory, glob="*.pdf", loader_cls=PyPDFLoader)
         documents = loader.load()
@@ -42,7 +48,7 @@ class ScholarAgent:
         )
         chunks = text_splitter.split_documents(documents)
         
-        print(f"Start storing {len(chunks)} memory chunks...")
+        logger.info(f"Start storing {len(chunks)} memory chunks...")
         
         # Save to ChromaDB
         self.vector_store = Chroma.from_documents(
@@ -50,14 +56,30 @@ class ScholarAgent:
             embedding=self.embeddings,
             persist_directory=self.persist_directory
         )
-        print("✅ [SCHOLAR] Memorization complete.")
+        logger.info("✅ [SCHOLAR] Memorization complete.")
 
-    def query(self, topic: str) -> List[str]:
+    @traced_call("scholar", "embed")
+    def embed_queries(self, topics: List[str]) -> List[List[float]]:
+        """
+        Embeds many queries, in ONE call (a single batched forward pass for the local model) when the
+        provider encodes queries and documents the same way (see app/providers.py). Otherwise each
+        goes through embed_query(), so the vectors always match what similarity_search() would use.
+        """
+        if self.symmetric_embeddings:
+            return self.embeddings.embed_documents(topics)
+        return [self.embeddings.embed_query(topic) for topic in topics]
+
+    @traced_call("scholar", "query")
+    def query(self, topic: str, embedding: Optional[List[float]] = None) -> List[str]:
         """
         Searches the memory for the given topic.
+        Pass a precomputed `embedding` of the topic to skip embedding it again.
         """
         if not self.vector_store:
             return ["Memory is empty. Please upload documents first."]
             
-        results = self.vector_store.similarity_search(topic, k=3)
+        if embedding is not None:
+            results = self.vector_store.similarity_search_by_vector(embedding, k=3)
+        else:
+            results = self.vector_store.similarity_search(topic, k=3)
         return [doc.page_content for doc in results]
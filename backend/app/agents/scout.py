@@ -1,5 +1,9 @@
-from ddgs import DDGS
+import logging
 from typing import List, Dict
+from app.telemetry import traced_call
+from app.providers import make_search
+
+logger = logging.getLogger(__name__)
 
 class ScoutAgent:
     """
@@ -9,20 +13,21 @@ class ScoutAgent:
     
     def __init__(self):
         # Initialize search session once to reuse connections
-        self.ddgs = DDGS()
+        self.ddgs = make_search()
 
+    @traced_call("scout", "search")
     def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
         """
         Scans the web for the given query using DuckDuckGo.
         Returns cleaned, text-only results to save LLM context window.
         """
-        print(f"🕵️ [SCOUT] Searching for: '{query}'...")
+        logger.info(f"🕵️ [SCOUT] Searching for: '{query}'...")
         
         try:
             # DuckDuckGo returns an iterator, convert to list
             results = list(self.ddgs.text(query, max_results=max_results))
         except Exception as e:
-            print(f"❌ [SCOUT] Error during search: {e}")
+            logger.error(f"❌ [SCOUT] Error during search: {e}")
             return []
         
         # Format the output for the "Commander" (LLM) to read easily
@@ -34,5 +39,5 @@ class ScoutAgent:
                 "snippet": r.get("body", "")  # DDGS already strips most HTML
             })
             
-        print(f"✅ [SCOUT] Found {len(clean_results)} intel reports.")
+        logger.info(f"✅ [SCOUT] Found {len(clean_results)} intel reports.")
         return clean_results
@@ -1,23 +1,36 @@
 from pydantic import ValidationError
 from langchain_core.load.dump import default
-from langchain_groq import ChatGroq
 from pydantic import BaseModel, Field, ValidationError
 from langchain_core.messages import SystemMessage, HumanMessage
+import asyncio
+import logging
+from app.telemetry import traced_call
+from app.providers import make_llm, DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
 
 class ForecastOutput(BaseModel):
     optimistic:str = Field(default_factory=str, description="Optimistic take on the context")
     base_case:str = Field(default_factory=str,description="Realistic take on the context")
     pessimistic:str = Field(default_factory=str,description="Pessimistic take on the context")
 
-class StrategistAgent:
-    def __init__(self):
-        self.llm = ChatGroq(model_name="llama-3.1-8b-instant")
+class ScenarioOutput(BaseModel):
+    scenario:str = Field(default_factory=str, description="One forecast scenario")
 
-    def analyze(self,context:str):
+# The three scenarios, each small enough to be generated by its own (faster) LLM call
+SCENARIOS = {
+    "optimistic": "Optimistic: Best case scenario (e.g., diplomatic success, minimal conflict).",
+    "base_case": "Base Case: Most likely scenario (realistic projection).",
+    "pessimistic": "Pessimistic: Worst case scenario (maximum conflict, worst outcomes).",
+}
 
-        print(f"🧠 [STRATEGIST] Analyzing context for strategic forecast...")
+class StrategistAgent:
+    def __init__(self):
+        self.model_name = DEFAULT_MODEL
+        self.llm = make_llm("strategist")
 
-        system_prompt = """
+    def _full_prompt(self) -> str:
+        return """
         You are a Senior Strategic Analyst for the Indian Armed Forces.
         Your job is to read raw intelligence reports and produce a "Strategic Forecast".
         
@@ -36,8 +49,13 @@ class StrategistAgent:
         Be concise, analytical, and avoid emotional language.
         """
 
+    @traced_call("strategist", "analyze")
+    def analyze(self,context:str):
+
+        logger.info(f"🧠 [STRATEGIST] Analyzing context for strategic forecast...")
+
         messages = [
-            SystemMessage(content=system_prompt),
+            SystemMessage(content=self._full_prompt()),
             HumanMessage(content=context)
         ]
 
@@ -48,10 +66,75 @@ class StrategistAgent:
 
             return validated.model_dump()
         except ValidationError as e:
-            print(f"❌ [STRATEGIST] Pydantic Validation Error: {e}")
+            logger.error(f"❌ [STRATEGIST] Pydantic Validation Error: {e}")
+            return {"optimistic": "", "base_case": "", "pessimistic": ""}
+        except Exception as e:
+            logger.error(f"❌ [STRATEGIST] Generation Error: {e}")
+            return {"optimistic": "", "base_case": "", "pessimistic": ""}
+
+    @traced_call("strategist", "analyze")
+    async def aanalyze(self, context: str):
+        """
+        Same single JSON-mode call as analyze(), but awaited, so it never blocks the event loop.
+        """
+        logger.info(f"🧠 [STRATEGIST] Analyzing context for strategic forecast (async)...")
+        messages = [
+            SystemMessage(content=self._full_prompt()),
+            HumanMessage(content=context)
+        ]
+        try:
+            raw_response = await self.llm.with_structured_output(method="json_mode").ainvoke(messages)
+            return ForecastOutput(**raw_response).model_dump()
+        except ValidationError as e:
+            logger.error(f"❌ [STRATEGIST] Pydantic Validation Error: {e}")
             return {"optimistic": "", "base_case": "", "pessimistic": ""}
         except Exception as e:
-            print(f"❌ [STRATEGIST] Generation Error: {e}")
+            logger.error(f"❌ [STRATEGIST] Generation Error: {e}")
             return {"optimistic": "", "base_case": "", "pessimistic": ""}
 
+    @traced_call("strategist", "scenario")
+    async def analyze_scenario(self, context: str, scenario: str) -> str:
+        """
+        Generates ONE scenario. Three of these run concurrently, each with a third of the output
+        tokens, so the first card is ready long before one big completion would finish.
+        """
+        system_prompt = f"""
+        You are a Senior Strategic Analyst for the Indian Armed Forces.
+        Read the raw intelligence report and write ONE scenario of a "Strategic Forecast":
+        {SCENARIOS[scenario]}
+
+        Return your analysis in the following JSON format:
+        {{
+            "scenario": "..."
+        }}
+
+        Be concise, analytical, and avoid emotional language.
+        """
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=context)
+        ]
+        try:
+            raw_response = await self.llm.with_structured_output(method="json_mode").ainvoke(messages)
+            return ScenarioOutput(**raw_response).scenario
+        except ValidationError as e:
+            logger.error(f"❌ [STRATEGIST] Pydantic Validation Error ({scenario}): {e}")
+            return ""
+        except Exception as e:
+            logger.error(f"❌ [STRATEGIST] Generation Error ({scenario}): {e}")
+            return ""
+
+    async def stream_scenarios(self, context: str):
+        """
+        Fires all three scenario calls at once and yields (scenario, text) in the order they FINISH.
+        """
+        logger.info(f"🧠 [STRATEGIST] Generating {len(SCENARIOS)} scenarios in parallel...")
+
+        async def run(name):
+            return name, await self.analyze_scenario(context, name)
+
+        for task in asyncio.as_completed([run(name) for name in SCENARIOS]):
+            yield await task
 
+    async def aanalyze_parallel(self, context: str):
+        return {name: text async for name, text in self.stream_scenarios(context)}
@@ -0,0 +1,176 @@
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from app.telemetry import record_cache
+from app.checkpointing import new_run_config, run_id, invoke_run, finish_run
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Batch execution of the graph.
+# N queries go through graph.batch_as_completed() with bounded parallelism, and the work
+# they have in common is done ONCE per batch: guard/router verdicts, identical searches,
+# and the query embeddings (one embedding call for the whole batch instead of one per query).
+# Results are yielded as each query finishes, so the wall time tracks the slowest query.
+# =========================================================
+CHAT_BATCH_MAX_QUERIES = int(os.getenv("CHAT_BATCH_MAX_QUERIES", "25"))         # Queries per /api/chat/batch call
+CHAT_BATCH_MAX_CONCURRENCY = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", "4"))  # Upper bound for max_concurrency
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Queries that only differ in case/spacing share their classification, search and embedding."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class BatchMemo:
+    """
+    Single-flight memo scoped to ONE batch and shared by every run in it (through the run config).
+    The first node to ask for a key computes it; nodes asking meanwhile wait for that result.
+    Failures are not memoized, so a resumed run tries again.
+    """
+    def __init__(self, queries: Optional[List[str]] = None):
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Future] = {}
+        # normalized -> first spelling seen, for the one-shot embedding call
+        self._texts: Dict[str, str] = {}
+        for query in queries or []:
+            self._texts.setdefault(normalize_query(query), query)
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    def _count(self, kind: str, hit: bool):
+        (self.hits if hit else self.misses)[kind] += 1
+        record_cache(f"batch_{kind}", hit)
+
+    def _discard(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get_or_compute(self, kind: str, key, compute: Callable):
+        entry = (kind, key)
+        with self._lock:
+            future = self._entries.get(entry)
+            owner = future is None
+            if owner:
+                future = self._entries[entry] = Future()
+        self._count(kind, not owner)
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except Exception as e:
+            self._discard([entry])
+            future.set_exception(e)
+            raise
+        future.set_result(value)
+        return value
+
+    def embedding(self, text: str, embed_many: Callable[[List[str]], List[List[float]]]) -> List[float]:
+        """
+        The first caller embeds EVERY query of the batch in a single embed_many() call;
+        everyone after that just picks up their vector.
+        """
+        entry = ("embedding", normalize_query(text))
+        with self._lock:
+            future = self._entries.get(entry)
+            claimed = None
+            if future is None:
+                self._texts.setdefault(entry[1], text)
+                claimed = {("embedding", q): raw for q, raw in self._texts.items()
+                           if ("embedding", q) not in self._entries}
+                futures = {key: Future() for key in claimed}
+                self._entries.update(futures)
+                future = futures[entry]
+        self._count("embedding", claimed is None)
+        if claimed is not None:
+            try:
+                vectors = embed_many(list(claimed.values()))
+            except Exception as e:
+                self._discard(claimed)
+                for key in claimed:
+                    futures[key].set_exception(e)
+                raise
+            for key, vector in zip(claimed, vectors):
+                futures[key].set_result(vector)
+        return future.result()
+
+    def stats(self) -> dict:
+        return {kind: {"computed": self.misses[kind], "shared": self.hits[kind]}
+                for kind in sorted(set(self.hits) | set(self.misses))}
+
+
+def batch_memo(config: Optional[dict]) -> Optional[BatchMemo]:
+    return ((config or {}).get("configurable") or {}).get("batch_memo")
+
+
+def memoized(config: Optional[dict], kind: str, key, compute: Callable):
+    """compute() once per batch for this key; outside a batch it simply calls compute()."""
+    memo = batch_memo(config)
+    if memo is None:
+        return compute()
+    return memo.get_or_compute(kind, key, compute)
+
+
+def _result(index: int, query: str, config: dict, output, deduplicated: bool) -> dict:
+    result = {"index": index, "query": query, "run_id": run_id(config), "deduplicated": deduplicated}
+    if isinstance(output, Exception):
+        # Checkpointed up to the failed node: POST /api/runs/{run_id}/resume picks it up from there
+        return {**result, "status": "error", "error": str(output), "error_type": type(output).__name__}
+    messages = output.get("messages", [])
+    return {
+        **result,
+        "status": "rejected" if output.get("is_allowed") == "no" else "ok",
+        "final_topic": output.get("final_topic"),
+        "answer": messages[-1].content if messages else None,
+        "duplicate_of": output.get("duplicate_of"),
+    }
+
+
+def run_batch(graph, queries: List[str], kind: str = "batch", max_concurrency: int = CHAT_BATCH_MAX_CONCURRENCY,
+              resume_retries: int = 0, memo: Optional[BatchMemo] = None) -> Iterator[dict]:
+    """
+    Yields one result dict per submitted query, in COMPLETION order (use "index" to match them up).
+    Exact repeats of a query run once and are fanned out ("deduplicated": true).
+    max_concurrency bounds the runs in flight, and also the node fan-out inside each run.
+    """
+    memo = memo if memo is not None else BatchMemo(queries)
+    positions: Dict[str, List[int]] = {}
+    for index, query in enumerate(queries):
+        positions.setdefault(query.strip(), []).append(index)
+    distinct = list(positions)
+
+    configs = []
+    for _ in distinct:
+        config = new_run_config(kind)
+        config["configurable"]["batch_memo"] = memo
+        config["max_concurrency"] = max_concurrency
+        configs.append(config)
+    inputs = [{"messages": [HumanMessage(content=query)]} for query in distinct]
+
+    start = time.perf_counter()
+    for position, output in graph.batch_as_completed(inputs, configs, return_exceptions=True):
+        config = configs[position]
+        if isinstance(output, Exception) and resume_retries and graph.checkpointer is not None:
+            # The other runs keep going in the executor while this one resumes from its failed node
+            logger.warning(f"♻️ [BATCH] {run_id(config)} failed ({output}); resuming from its checkpoint")
+            try:
+                output = invoke_run(graph, None, config, resume_retries=resume_retries - 1)
+            except Exception as e:
+                output = e
+        elif not isinstance(output, Exception):
+            finish_run(graph, config)
+        for n, index in enumerate(positions[distinct[position]]):
+            yield _result(index, queries[index], config, output, deduplicated=n > 0)
+    logger.info(f"📦 [BATCH] {len(queries)} queries ({len(distinct)} distinct) in {time.perf_counter() - start:.1f}s "
+                f"| shared work: {memo.stats()}")
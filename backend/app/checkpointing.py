@@ -0,0 +1,188 @@
+import os
+import time
+import uuid
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from app.databases.db_config import DATABASE_URL, to_libpq_url
+from app.telemetry import record_error
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Graph Checkpointing
+# Every graph run gets its own thread_id and a checkpoint after each superstep.
+# If a node fails, the run can be resumed with graph.invoke(None, config): LangGraph
+# restarts from the last checkpoint and re-runs ONLY the failed node(s). Nodes that already
+# succeeded (guard, router, scout, scholar, cartographer...) are never paid for twice.
+# =========================================================
+# "postgres" (same database as the app), "sqlite" (local file), "memory" (process only) or "off"
+GRAPH_CHECKPOINTER = os.getenv(
+    "GRAPH_CHECKPOINTER", "postgres" if DATABASE_URL.startswith("postgresql") else "sqlite"
+)
+CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "./data/checkpoints.sqlite")
+# The checkpointer keeps its own small psycopg pool, so checkpoint writes never wait on the API's pool
+CHECKPOINT_POOL_SIZE = int(os.getenv("CHECKPOINT_POOL_SIZE", "4"))
+# Successful runs are deleted right away unless this is on; failed runs are kept for resume/inspection
+CHECKPOINT_KEEP_SUCCESSFUL = os.getenv("CHECKPOINT_KEEP_SUCCESSFUL", "false").lower() == "true"
+# Failed runs older than this are pruned by the scheduler
+CHECKPOINT_RETENTION_HOURS = float(os.getenv("CHECKPOINT_RETENTION_HOURS", "72"))
+# How many times the autopilot resumes a failed run before giving up
+AUTOPILOT_RESUME_RETRIES = int(os.getenv("AUTOPILOT_RESUME_RETRIES", "2"))
+
+
+def make_checkpointer(kind: str = GRAPH_CHECKPOINTER):
+    if kind == "off":
+        return None
+    if kind == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+    if kind == "sqlite":
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        os.makedirs(os.path.dirname(os.path.abspath(CHECKPOINT_SQLITE_PATH)), exist_ok=True)
+        # The API worker threads and the scheduler thread share this connection; SqliteSaver locks around it
+        saver = SqliteSaver(sqlite3.connect(CHECKPOINT_SQLITE_PATH, check_same_thread=False))
+        saver.setup()
+        return saver
+    if kind == "postgres":
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+        from langgraph.checkpoint.postgres import PostgresSaver
+
+        pool = ConnectionPool(
+            to_libpq_url(DATABASE_URL), min_size=1, max_size=CHECKPOINT_POOL_SIZE, open=True,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        )
+        saver = PostgresSaver(pool)
+        saver.setup()
+        return saver
+    raise ValueError(f"Unknown GRAPH_CHECKPOINTER: {kind}")
+
+
+def new_run_config(kind: str, label: Optional[str] = None) -> dict:
+    """A fresh thread per run: checkpoints are for resuming a run, not for conversation memory."""
+    prefix = f"{kind}-{label}" if label else kind
+    return {"configurable": {"thread_id": f"{prefix}-{uuid.uuid4().hex[:12]}"}}
+
+
+def run_id(config: dict) -> str:
+    return config["configurable"]["thread_id"]
+
+
+def invoke_run(graph, inputs: Any, config: dict, resume_retries: int = 0, backoff: float = 2.0):
+    """
+    Runs the graph; on failure, resumes from the last checkpoint up to `resume_retries` times,
+    so each retry only redoes the stage that failed. Raises the last error if all attempts fail.
+    """
+    checkpointed = graph.checkpointer is not None
+    attempt, payload = 0, inputs
+    while True:
+        try:
+            result = graph.invoke(payload, config)
+            break
+        except Exception as e:
+            if not checkpointed or attempt >= resume_retries:
+                raise
+            attempt += 1
+            record_error("graph.resume", e)
+            failed = graph.get_state(config).next
+            logger.warning(f"♻️ [CHECKPOINT] Run {run_id(config)} failed at {list(failed)} ({e}); "
+                           f"resuming from there (attempt {attempt}/{resume_retries})")
+            time.sleep(backoff * attempt)
+            payload = None   # None = "continue from the last checkpoint"
+    finish_run(graph, config)
+    return result
+
+
+def resume_run(graph, thread_id: str):
+    """Continues a previously failed run from its last checkpoint."""
+    config = {"configurable": {"thread_id": thread_id}}
+    return invoke_run(graph, None, config)
+
+
+def finish_run(graph, config: dict):
+    """A run that completed has nothing left to resume: drop its checkpoints unless told to keep them."""
+    if graph.checkpointer is not None and not CHECKPOINT_KEEP_SUCCESSFUL:
+        discard_run(graph, config)
+
+
+def discard_run(graph, config: dict):
+    try:
+        graph.checkpointer.delete_thread(run_id(config))
+    except Exception as e:
+        logger.warning(f"⚠️ [CHECKPOINT] Could not delete run {run_id(config)}: {e}")
+
+
+def _serialize(value):
+    # Messages -> {"type", "content"}; everything else in the state is already JSON-friendly
+    if isinstance(value, list):
+        return [_serialize(v) for v in value]
+    if hasattr(value, "content") and hasattr(value, "type"):
+        return {"type": value.type, "content": value.content}
+    return value
+
+
+def describe_run(graph, thread_id: str, history: int = 20) -> Optional[dict]:
+    """Operator view of a run: where it stopped, the state at that point, and its checkpoint trail."""
+    config = {"configurable": {"thread_id": thread_id}}
+    snapshot = graph.get_state(config)
+    if not snapshot.created_at:
+        return None
+    trail = []
+    for i, past in enumerate(graph.get_state_history(config)):
+        if i >= history:
+            break
+        trail.append({
+            "checkpoint_id": past.config["configurable"]["checkpoint_id"],
+            "step": past.metadata.get("step"),
+            "source": past.metadata.get("source"),
+            "completed": sorted((past.metadata.get("writes") or {}).keys()),
+            "next": list(past.next),
+            "created_at": past.created_at,
+        })
+    return {
+        "run_id": thread_id,
+        "status": "incomplete" if snapshot.next else "complete",
+        "next": list(snapshot.next),
+        "errors": [{"node": t.name, "error": t.error and repr(t.error)} for t in snapshot.tasks if t.error],
+        "created_at": snapshot.created_at,
+        "values": {k: _serialize(v) for k, v in snapshot.values.items()},
+        "history": trail,
+    }
+
+
+def list_runs(graph, limit: int = 50) -> list:
+    """Most recent runs still held by the checkpointer (by default: the ones that failed)."""
+    if graph.checkpointer is None:
+        return []
+    runs, seen = [], set()
+    for checkpoint in graph.checkpointer.list(None):
+        thread_id = checkpoint.config["configurable"]["thread_id"]
+        if thread_id in seen:
+            continue
+        seen.add(thread_id)
+        runs.append({"run_id": thread_id, "updated_at": checkpoint.checkpoint["ts"],
+                     "step": checkpoint.metadata.get("step")})
+        if len(runs) >= limit:
+            break
+    return runs
+
+
+def prune_runs(graph, retention_hours: float = CHECKPOINT_RETENTION_HOURS) -> int:
+    """Deletes runs whose latest checkpoint is older than the retention window."""
+    if graph.checkpointer is None:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    latest = {}
+    for checkpoint in graph.checkpointer.list(None):
+        thread_id = checkpoint.config["configurable"]["thread_id"]
+        ts = datetime.fromisoformat(checkpoint.checkpoint["ts"])
+        if thread_id not in latest or ts > latest[thread_id]:
+            latest[thread_id] = ts
+    stale = [thread_id for thread_id, ts in latest.items() if ts < cutoff]
+    for thread_id in stale:
+        graph.checkpointer.delete_thread(thread_id)
+    return len(stale)
@@ -0,0 +1,24 @@
+import os
+from typing import Optional
+import zstandard
+
+# Level 3 is zstd's default: ~4-6x smaller for scraped JSON/text at a few hundred MB/s.
+# Higher levels squeeze a little more but cost CPU on EVERY autopilot write.
+PAYLOAD_ZSTD_LEVEL = int(os.getenv("PAYLOAD_ZSTD_LEVEL", "3"))
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """
+    str -> zstd frame. None stays None so "no scout data" is still distinguishable from "empty".
+    We use the module-level helpers on purpose: a shared ZstdCompressor object is NOT thread-safe,
+    and graph nodes write from the API thread and the scheduler thread at the same time.
+    """
+    if text is None:
+        return None
+    return zstandard.compress(text.encode("utf-8"), PAYLOAD_ZSTD_LEVEL)
+
+
+def decompress_text(blob: Optional[bytes]) -> Optional[str]:
+    if blob is None:
+        return None
+    return zstandard.decompress(bytes(blob)).decode("utf-8")
@@ -0,0 +1,158 @@
+import os
+import math
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# =========================================================
+# Time decay without rewriting old rows
+# A mention at time t is worth exp(-LAMBDA * (now - t)) today.
+# We store exp(LAMBDA * (t - EPOCH)) instead, so:
+#   * adding a mention is "score += constant" (atomic in SQL, no read-modify-write)
+#   * today's weight is score * exp(-LAMBDA * (now - EPOCH)), the SAME factor for every pair,
+#     so ranking by raw score is already ranking by decayed weight.
+# The exponent grows by ln(2) per half-life, so exp() would overflow after ~1024 half-lives
+# (~84 years at 30 days, but only ~20 years at 7). It is capped at MAX_EXPONENT: past that
+# date new mentions stop outweighing old ones, but nothing turns into inf/NaN.
+# =========================================================
+logger = logging.getLogger(__name__)
+
+COOCCURRENCE_HALF_LIFE_DAYS = float(os.getenv("COOCCURRENCE_HALF_LIFE_DAYS", "30"))
+if not COOCCURRENCE_HALF_LIFE_DAYS > 0:
+    raise ValueError(f"COOCCURRENCE_HALF_LIFE_DAYS must be positive, got {COOCCURRENCE_HALF_LIFE_DAYS}")
+DECAY_LAMBDA = math.log(2) / (COOCCURRENCE_HALF_LIFE_DAYS * 86400)
+DECAY_EPOCH = datetime(2025, 1, 1)
+# exp(600) ~ 1e260 leaves room for summing ~1e48 capped mentions before float64 runs out
+MAX_EXPONENT = 600.0
+DECAY_SATURATES_AT = DECAY_EPOCH + timedelta(seconds=MAX_EXPONENT / DECAY_LAMBDA)
+if DECAY_SATURATES_AT < datetime(2075, 1, 1):
+    logger.warning(f"⚠️ [COOCCURRENCE] A {COOCCURRENCE_HALF_LIFE_DAYS:g} day half-life stops decaying "
+                   f"on {DECAY_SATURATES_AT:%Y-%m-%d}; use a longer half-life")
+
+
+def _exponent(when: datetime) -> float:
+    return min(max(DECAY_LAMBDA * (when - DECAY_EPOCH).total_seconds(), -MAX_EXPONENT), MAX_EXPONENT)
+
+def mention_score(when: datetime) -> float:
+    return math.exp(_exponent(when))
+
+def decay_factor(now: datetime) -> float:
+    return math.exp(-_exponent(now))
+
+
+class CooccurrenceGraph:
+    """
+    In-memory mirror of entity_cooccurrences as a symmetric scipy CSR matrix (row/col = entity id).
+    CSR makes "all neighbours of X" a contiguous slice, so top-k is a few microseconds of numpy.
+    CSR is expensive to modify, so new pairs collect in a small `pending` dict and get
+    merged into the matrix once it grows past COMPACT_EVERY entries.
+    """
+    COMPACT_EVERY = 500
+
+    def __init__(self):
+        # Re-entrant: add_briefing() runs inside applying(), which holds it already
+        self._lock = threading.RLock()
+        self.scores = sparse.csr_matrix((0, 0))
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.pending: Dict[Tuple[int, int], List[float]] = {}   # (a, b) -> [score_delta, count_delta]
+        self.warmed = False
+
+    def warm(self, db):
+        """
+        Rebuilds the matrix from Postgres in one query. Also used periodically to pick up other workers' writes.
+        The lock is held across the query, and this process's writers commit under it too (see applying()),
+        so each of our briefings is either in the rows read here or added as a delta afterwards, never both.
+        """
+        from .models import EntityCooccurrence
+
+        with self._lock:
+            rows = db.query(EntityCooccurrence.entity_a_id, EntityCooccurrence.entity_b_id,
+                            EntityCooccurrence.score, EntityCooccurrence.count).all()
+            self.scores, self.counts = self._build([(a, b, s, c) for a, b, s, c in rows])
+            self.pending = {}
+            self.warmed = True
+
+    @contextmanager
+    def applying(self):
+        """
+        Wrap "commit the briefing's co-occurrence rows, then add_briefing()" in this. Without it, a commit
+        landing before warm()'s query with add_briefing() after it would count that briefing twice.
+        """
+        with self._lock:
+            yield
+
+    def ensure_warm(self, db):
+        if not self.warmed:
+            self.warm(db)
+
+    @staticmethod
+    def _build(edges):
+        # Store both directions so any entity's neighbours are a single row slice
+        size = max((max(a, b) for a, b, _, _ in edges), default=-1) + 1
+        rows = [a for a, b, _, _ in edges] + [b for a, b, _, _ in edges]
+        cols = [b for a, b, _, _ in edges] + [a for a, b, _, _ in edges]
+        score_data = [s for _, _, s, _ in edges] * 2
+        count_data = [c for _, _, _, c in edges] * 2
+        # coo -> csr SUMS duplicate coordinates, which is exactly how we merge pending deltas
+        scores = sparse.coo_matrix((score_data, (rows, cols)), shape=(size, size)).tocsr()
+        counts = sparse.coo_matrix((count_data, (rows, cols)), shape=(size, size), dtype=np.int64).tocsr()
+        return scores, counts
+
+    def add_briefing(self, entity_ids: List[int], when: datetime):
+        """Called AFTER the DB commit, with the entities of one new briefing."""
+        ids = sorted(set(entity_ids))
+        increment = mention_score(when)
+        with self._lock:
+            for i, a in enumerate(ids):
+                for b in ids[i + 1:]:
+                    delta = self.pending.setdefault((a, b), [0.0, 0])
+                    delta[0] += increment
+                    delta[1] += 1
+            if len(self.pending) >= self.COMPACT_EVERY:
+                self._compact()
+
+    def _compact(self):
+        # Merge pending deltas into the CSR matrices (caller holds the lock)
+        coo_s, coo_c = self.scores.tocoo(), self.counts.tocoo()
+        edges = [(a, b, s, c) for a, b, s, c in zip(coo_s.row, coo_s.col, coo_s.data, coo_c.data) if a < b]
+        edges += [(a, b, d[0], d[1]) for (a, b), d in self.pending.items()]
+        self.scores, self.counts = self._build(edges)
+        self.pending = {}
+
+    def related(self, entity_id: int, k: int = 10, now: datetime = None) -> List[dict]:
+        """
+        Top-k co-occurring entities for entity_id, with weights decayed to `now`.
+        """
+        neighbours: Dict[int, List[float]] = {}
+        with self._lock:
+            if entity_id < self.scores.shape[0]:
+                start, end = self.scores.indptr[entity_id], self.scores.indptr[entity_id + 1]
+                for col, s, c in zip(self.scores.indices[start:end], self.scores.data[start:end], self.counts.data[start:end]):
+                    neighbours[int(col)] = [float(s), int(c)]
+            for (a, b), (s, c) in self.pending.items():
+                other = b if a == entity_id else a if b == entity_id else None
+                if other is not None:
+                    entry = neighbours.setdefault(other, [0.0, 0])
+                    entry[0] += s
+                    entry[1] += c
+
+        if not neighbours:
+            return []
+        ids = np.fromiter(neighbours.keys(), dtype=np.int64)
+        raw = np.fromiter((v[0] for v in neighbours.values()), dtype=np.float64)
+        top = np.argsort(-raw)[:k] if len(raw) <= k else np.argpartition(-raw, k)[:k]
+        top = top[np.argsort(-raw[top])]
+        factor = decay_factor(now or datetime.utcnow())
+        return [
+            {"id": int(ids[i]), "weight": round(float(raw[i]) * factor, 4), "count": neighbours[int(ids[i])][1]}
+            for i in top
+        ]
+
+
+# Singleton shared by every CRUD and the API in this process
+cooccurrence_graph = CooccurrenceGraph()
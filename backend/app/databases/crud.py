@@ -1,32 +1,239 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List, Any
-from .models import Briefing, Location, Entity
+from sqlalchemy import select, insert, func, case, or_, null, literal
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Any, Optional, Tuple, AsyncIterator
+from .models import Briefing, Location, Entity, MentionBucket, BriefingLocations, BriefingEntities, BriefingPayload, EntityAlias, EntityCooccurrence, Forecast
+from .compression import compress_text, decompress_text
+from .cooccurrence import CooccurrenceGraph, cooccurrence_graph, mention_score
+from .entity_index import EntityAliasIndex, entity_index, normalize_entity_name
+from app.telemetry import record_cache
+from app.agents.geocoder import GeocoderUnavailable
+
+# The bucket sizes we maintain rollups for, and how far apart two neighbouring buckets are.
+BUCKET_STEPS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """
+    Truncates a timestamp down to the start of its bucket.
+    Weeks start on Monday (ISO), so every writer agrees on the same bucket key.
+    """
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+# =========================================================
+# Statement Builders
+# The SAME select() is executed by the sync CRUD (graph nodes, scheduler)
+# and the AsyncCRUD (API routes), so the two paths can never drift apart.
+# =========================================================
+
+def recent_briefings_stmt(limit: int):
+    # We use .order_by(Briefing.created_at.desc()) to get the newest ones first.
+    # selectinload fetches ALL locations in one extra query, instead of one lazy query per briefing
+    # (lazy loading is also impossible on an AsyncSession).
+    return (
+        select(Briefing)
+        .options(selectinload(Briefing.locations))
+        .order_by(Briefing.created_at.desc())
+        .limit(limit)
+    )
+
+def entity_mentions_stmt():
+    # Get count of briefings per entity using a SQL JOIN
+    mention_count = func.count(BriefingEntities.briefing_id)
+    return (
+        select(Entity.id, Entity.name, Entity.type, mention_count.label("mention_count"))
+        .join(BriefingEntities, Entity.id == BriefingEntities.entity_id)
+        .group_by(Entity.id)
+        .order_by(mention_count.desc())
+    )
+
+def timeline_stmt(subject_type: str, granularity: str, start: datetime, end: datetime, subject_ids: Optional[List[int]] = None):
+    stmt = select(
+        MentionBucket.subject_id, MentionBucket.bucket_start, MentionBucket.mention_count
+    ).where(
+        MentionBucket.subject_type == subject_type,
+        MentionBucket.granularity == granularity,
+        MentionBucket.bucket_start >= bucket_start(start, granularity),
+        MentionBucket.bucket_start <= end,
+    )
+    if subject_ids:
+        stmt = stmt.where(MentionBucket.subject_id.in_(subject_ids))
+    return stmt.order_by(MentionBucket.bucket_start, MentionBucket.subject_id)
+
+def top_movers_stmt(subject_type: str, granularity: str, window: int = 7, k: int = 10, now: Optional[datetime] = None):
+    # Everything (both windows, the delta and the ranking) is computed in ONE SQL query.
+    now = now or datetime.utcnow()
+    step = BUCKET_STEPS[granularity]
+    current_start = bucket_start(now, granularity) - step * (window - 1)
+    previous_start = current_start - step * window
+
+    current = func.sum(case((MentionBucket.bucket_start >= current_start, MentionBucket.mention_count), else_=0))
+    previous = func.sum(case((MentionBucket.bucket_start < current_start, MentionBucket.mention_count), else_=0))
+
+    return (
+        select(
+            MentionBucket.subject_id,
+            current.label("current"),
+            previous.label("previous"),
+            (current - previous).label("delta"),
+        )
+        .where(
+            MentionBucket.subject_type == subject_type,
+            MentionBucket.granularity == granularity,
+            MentionBucket.bucket_start >= previous_start,
+        )
+        .group_by(MentionBucket.subject_id)
+        .order_by((current - previous).desc())
+        .limit(k)
+    )
+
+def payloads_stmt(briefing_ids: List[int]):
+    return select(BriefingPayload).where(BriefingPayload.briefing_id.in_(briefing_ids))
+
+def build_payload(briefing: Briefing, scout_data: Optional[str], scholar_data: Optional[str]) -> BriefingPayload:
+    scout_blob = compress_text(scout_data)
+    scholar_blob = compress_text(scholar_data)
+    return BriefingPayload(
+        briefing_id=briefing.id,
+        created_at=briefing.created_at,   # Same timestamp => lands in the same monthly partition
+        scout_data=scout_blob,
+        scholar_data=scholar_blob,
+        raw_bytes=len((scout_data or "").encode()) + len((scholar_data or "").encode()),
+        compressed_bytes=len(scout_blob or b"") + len(scholar_blob or b""),
+    )
+
+def unpack_payload(payload: Optional[BriefingPayload]) -> dict:
+    if payload is None:
+        return {"scout_data": None, "scholar_data": None}
+    return {
+        "scout_data": decompress_text(payload.scout_data),
+        "scholar_data": decompress_text(payload.scholar_data),
+    }
+
+def export_briefings_stmt(start: Optional[datetime] = None, end: Optional[datetime] = None, since_id: Optional[int] = None):
+    # Plain columns instead of Briefing objects: nothing piles up in the session's identity map while streaming.
+    # Ordered by id, so the last id of one export is the since_id of the next.
+    stmt = select(
+        Briefing.id, Briefing.topic, Briefing.content, Briefing.created_at, Briefing.last_seen_at, Briefing.seen_count
+    )
+    if since_id is not None:
+        stmt = stmt.where(Briefing.id > since_id)
+    if start is not None:
+        stmt = stmt.where(Briefing.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(Briefing.created_at < end)
+    return stmt.order_by(Briefing.id)
+
+def export_locations_stmt(briefing_ids: List[int]):
+    return (
+        select(BriefingLocations.briefing_id, Location.name)
+        .join(Location, Location.id == BriefingLocations.location_id)
+        .where(BriefingLocations.briefing_id.in_(briefing_ids))
+        .order_by(BriefingLocations.id)
+    )
+
+def export_entities_stmt(briefing_ids: List[int]):
+    return (
+        select(BriefingEntities.briefing_id, Entity.name, Entity.type)
+        .join(Entity, Entity.id == BriefingEntities.entity_id)
+        .where(BriefingEntities.briefing_id.in_(briefing_ids))
+        .order_by(BriefingEntities.id)
+    )
+
+def export_payloads_stmt(briefing_ids: List[int]):
+    return select(
+        BriefingPayload.briefing_id, BriefingPayload.scout_data, BriefingPayload.scholar_data
+    ).where(BriefingPayload.briefing_id.in_(briefing_ids))
+
+def subject_names_stmt(subject_type: str, subject_ids):
+    if subject_type == "entity":
+        return select(Entity.id, Entity.name, Entity.type).where(Entity.id.in_(subject_ids))
+    return select(Location.id, Location.name, literal("Location").label("type")).where(Location.id.in_(subject_ids))
 
 class CRUD:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, alias_index: EntityAliasIndex = entity_index, graph: CooccurrenceGraph = cooccurrence_graph):
         self.db = db
+        self.alias_index = alias_index
+        self.graph = graph
+        self._pending_index = []
 
-    def save_briefing(self, topic: str, content: str, locations: List[Any], scout_data: str = None, scholar_data: str = None, entities: dict = None):
+    def save_briefing(self, topic: str, content: str, locations: List[Any], scout_data: str = None, scholar_data: str = None, entities: dict = None, simhash: int = None, run_id: str = None):
         briefing = Briefing(
             topic=topic, 
             content=content,
-            scout_data=scout_data,
-            scholar_data=scholar_data
+            simhash=simhash,
+            run_id=run_id
         )
         briefing.locations = self.save_locations(locations)
-        if entities:
-            briefing.entities = self.save_entities(entities)
+        entity_ids = self.save_entities(entities) if entities else []
         
-        # This updates the object with its new ID from PostgreSQL
+        # Flush first so created_at is populated, then bump the timeline rollups
+        # inside the SAME transaction. Either the briefing and its counts land together, or neither does.
         self.db.add(briefing)
-        self.db.commit()
+        self.db.flush()
+        entity_ids = self._link_entities(briefing.id, entity_ids, entities)
+        self.record_mentions("location", [loc.id for loc in briefing.locations], briefing.created_at)
+        self.record_mentions("entity", entity_ids, briefing.created_at)
+        self.record_cooccurrences(entity_ids, briefing.created_at)
+        if scout_data is not None or scholar_data is not None:
+            self.db.add(build_payload(briefing, scout_data, scholar_data))
+
+        # This updates the object with its new ID from PostgreSQL.
+        # Committed under the graph's lock so a concurrent warm() can't count these pairs twice.
+        with self.graph.applying():
+            self.db.commit()
+            self.graph.add_briefing(entity_ids, briefing.created_at)
+        self._publish_aliases()
         self.db.refresh(briefing)
         return briefing
 
+    def get_briefing_by_run(self, run_id: str) -> Optional[Briefing]:
+        """The briefing a graph run already saved, if any (see Briefing.run_id)."""
+        return self.db.query(Briefing).filter(Briefing.run_id == run_id).first()
+
     def get_recent_briefings(self, limit: int = 10):
-        # We use .order_by(Briefing.created_at.desc()) to get the newest ones first
-        return self.db.query(Briefing).order_by(Briefing.created_at.desc()).limit(limit).all()
+        return self.db.scalars(recent_briefings_stmt(limit)).all()
+
+    def latest_briefing_id(self) -> int:
+        return self.db.query(func.max(Briefing.id)).scalar() or 0
+
+    def record_repeat_sighting(self, briefing_id: int, when: Optional[datetime] = None) -> bool:
+        """
+        A near-duplicate of this briefing was just generated: attach the new timestamp instead of
+        inserting a copy. Returns False if the briefing no longer exists.
+        """
+        updated = self.db.query(Briefing).filter(Briefing.id == briefing_id).update(
+            {Briefing.seen_count: Briefing.seen_count + 1, Briefing.last_seen_at: when or datetime.utcnow()},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return updated > 0
+
+    def get_recent_fingerprints(self, since: datetime):
+        return self.db.query(Briefing.id, Briefing.simhash, Briefing.created_at).filter(
+            Briefing.created_at >= since, Briefing.simhash.isnot(None)
+        ).order_by(Briefing.created_at).all()
+
+    def get_briefing_payloads(self, briefing_ids: List[int]) -> dict:
+        """
+        On-demand load of the raw scout/scholar intel, decompressed. {briefing_id: {...}}
+        """
+        if not briefing_ids:
+            return {}
+        return {p.briefing_id: unpack_payload(p) for p in self.db.scalars(payloads_stmt(briefing_ids)).all()}
 
     def save_locations(self, locations: List[Any]):
         
@@ -82,8 +289,11 @@ class CRUD:
                 
         return location_objects
 
-    def save_entities(self, entities_dict: dict):
-        entity_objects = []
+    def save_entities(self, entities_dict: dict) -> List[int]:
+        """
+        Resolves extracted names to entity ids, creating the ones never seen before.
+        Only index misses query Postgres; index hits are returned without loading their Entity rows.
+        """
         # 1. Flatten the dict into a list of (name, type) tuples
         flat_entities = []
         for entity_type, names in entities_dict.items():
@@ -96,36 +306,383 @@ class CRUD:
                 if isinstance(name, str) and name.strip():
                     flat_entities.append((name.strip(), mapped_type))
 
-        # 2. Deduplicate by name
+        # 2. Deduplicate by NORMALIZED name, so "USA" and "U.S." in one briefing become one entity.
+        # The first spelling we see is the one used as the display name if we must create it.
         unique_entities = {}
         for name, typ in flat_entities:
-            unique_entities[name] = typ
-            
-        unique_names = list(unique_entities.keys())
-        if not unique_names:
+            key = normalize_entity_name(name)
+            if key and key not in unique_entities:
+                unique_entities[key] = (name, typ)
+        if not unique_entities:
             return []
 
-        # 3. Ask Postgres for ALL existing entities in our list at once
-        existing_ents = self.db.query(Entity).filter(Entity.name.in_(unique_names)).all()
-        existing_names = {ent.name for ent in existing_ents}
-        
-        # Add already-existing entities
-        entity_objects.extend(existing_ents)
-        
-        # 4. For any entity that didn't exist, create a new object safely
-        for e_name in unique_names:
-            if e_name not in existing_names:
-                new_ent = Entity(name=e_name, type=unique_entities[e_name])
-                
-                # OPTIMISTIC LOCKING: Same savepoint trap we built for locations
+        # 3. Resolve as much as possible from the in-memory alias index (no DB query at all):
+        # exact normalized hit first, then a same-type fuzzy match for typos.
+        # Fuzzy matches are NOT saved as aliases: a wrong one would become permanent. Only exact
+        # keys are, so a misspelling is matched again (in memory) each time it shows up.
+        self.alias_index.ensure_warm(self.db)
+        resolved = {}          # key -> entity_id
+        for key, (name, typ) in unique_entities.items():
+            entity_id = self.alias_index.lookup(key)
+            if entity_id is None:
+                fuzzy = self.alias_index.fuzzy_lookup(key, typ)
+                if fuzzy:
+                    entity_id = fuzzy[0]
+            if entity_id is not None:
+                resolved[key] = entity_id
+            record_cache("entity_alias", entity_id is not None)
+
+        # 4. Index misses: another worker may have created them. ONE query on the alias table.
+        missing = [key for key in unique_entities if key not in resolved]
+        if missing:
+            for alias in self.db.query(EntityAlias).filter(EntityAlias.alias.in_(missing)).all():
+                resolved[alias.alias] = alias.entity_id
+                self._pending_index.append((alias.alias, alias.entity_id, unique_entities[alias.alias][1]))
+
+        # 5. Resolved ids are used as they are, no Entity rows are loaded. A stale id (an entity that was
+        # merged away by another worker) is caught by the foreign key in _link_entities.
+        entity_ids = list(dict.fromkeys(resolved.values()))
+
+        # 6. Genuinely new entities: create the row AND its alias, using the same savepoint trap as locations
+        for key, (e_name, e_type) in unique_entities.items():
+            if key in resolved:
+                continue
+            new_ent = Entity(name=e_name, type=e_type)
+            try:
+                with self.db.begin_nested():
+                    self.db.add(new_ent)
+                    self.db.flush()
+                    self.db.add(EntityAlias(alias=key, entity_id=new_ent.id))
+                    self.db.flush()
+                entity_ids.append(new_ent.id)
+                self._pending_index.append((key, new_ent.id, e_type))
+            except IntegrityError:
+                # Another thread created this entity (or alias) first. Use theirs.
+                alias = self.db.query(EntityAlias).filter(EntityAlias.alias == key).first()
+                concurrent_id = (
+                    alias.entity_id if alias
+                    else self.db.query(Entity.id).filter(Entity.name == e_name).scalar()
+                )
+                if concurrent_id is not None and concurrent_id not in entity_ids:
+                    entity_ids.append(concurrent_id)
+
+        return entity_ids
+
+    def _link_entities(self, briefing_id: int, entity_ids: List[int], entities_dict: Optional[dict]) -> List[int]:
+        """
+        Inserts the briefing_entities rows straight from the ids. If the foreign key rejects one,
+        the index held a stale id: forget it and resolve the names again (this time via the alias table).
+        Returns the ids actually linked.
+        """
+        if not entity_ids:
+            return []
+        try:
+            with self.db.begin_nested():
+                self.db.execute(insert(BriefingEntities), [{"briefing_id": briefing_id, "entity_id": eid} for eid in entity_ids])
+            return entity_ids
+        except IntegrityError:
+            alive = set(self.db.scalars(select(Entity.id).where(Entity.id.in_(entity_ids))))
+            for stale_id in set(entity_ids) - alive:
+                self.alias_index.discard_entity(stale_id)
+            entity_ids = self.save_entities(entities_dict)
+            with self.db.begin_nested():
+                self.db.execute(insert(BriefingEntities), [{"briefing_id": briefing_id, "entity_id": eid} for eid in entity_ids])
+            return entity_ids
+
+    def _publish_aliases(self):
+        """
+        Pushes aliases into the process-wide index only AFTER the commit succeeded,
+        so a rolled-back transaction can never leave the index pointing at a ghost entity.
+        """
+        for key, entity_id, entity_type in self._pending_index:
+            self.alias_index.add(key, entity_id, entity_type)
+        self._pending_index = []
+
+    def record_mentions(self, subject_type: str, subject_ids: List[int], when: datetime):
+        """
+        Incrementally adds one mention per subject to the hour, day and week buckets containing `when`.
+        """
+        subject_ids = list(set(subject_ids))
+        if not subject_ids:
+            return
+
+        for granularity in BUCKET_STEPS:
+            start = bucket_start(when, granularity)
+            bucket_filter = (
+                MentionBucket.subject_type == subject_type,
+                MentionBucket.granularity == granularity,
+                MentionBucket.bucket_start == start,
+            )
+
+            # 1. Ask Postgres which of these buckets already exist (1 query per granularity)
+            existing_ids = {
+                row.subject_id for row in
+                self.db.query(MentionBucket.subject_id)
+                .filter(*bucket_filter, MentionBucket.subject_id.in_(subject_ids))
+                .all()
+            }
+
+            # 2. Increment them atomically in SQL. "count = count + 1" never loses an update,
+            # unlike reading the number into Python and writing it back.
+            if existing_ids:
+                self.db.query(MentionBucket).filter(
+                    *bucket_filter, MentionBucket.subject_id.in_(existing_ids)
+                ).update(
+                    {MentionBucket.mention_count: MentionBucket.mention_count + 1},
+                    synchronize_session=False
+                )
+
+            # 3. Create the missing buckets using the same savepoint trap as save_locations
+            for subject_id in subject_ids:
+                if subject_id in existing_ids:
+                    continue
+                try:
+                    with self.db.begin_nested():
+                        self.db.add(MentionBucket(
+                            subject_type=subject_type,
+                            subject_id=subject_id,
+                            granularity=granularity,
+                            bucket_start=start,
+                            mention_count=1
+                        ))
+                        self.db.flush()
+                except IntegrityError:
+                    # Another writer created this bucket first, so just add our mention to theirs.
+                    self.db.query(MentionBucket).filter(
+                        *bucket_filter, MentionBucket.subject_id == subject_id
+                    ).update(
+                        {MentionBucket.mention_count: MentionBucket.mention_count + 1},
+                        synchronize_session=False
+                    )
+
+    def record_cooccurrences(self, entity_ids: List[int], when: datetime):
+        """
+        Adds one co-occurrence for every pair of entities in this briefing.
+        Every pair gets the SAME increment, so all existing pairs are bumped with ONE UPDATE.
+        """
+        ids = sorted(set(entity_ids))
+        if len(ids) < 2:
+            return
+        increment = mention_score(when)
+        pair_filter = (EntityCooccurrence.entity_a_id.in_(ids), EntityCooccurrence.entity_b_id.in_(ids))
+
+        # 1. Which pairs already exist? (a < b is guaranteed, so this matches exactly our pairs)
+        existing = {
+            (row.entity_a_id, row.entity_b_id) for row in
+            self.db.query(EntityCooccurrence.entity_a_id, EntityCooccurrence.entity_b_id).filter(*pair_filter).all()
+        }
+
+        # 2. Bump them all atomically in SQL
+        bump = {
+            EntityCooccurrence.count: EntityCooccurrence.count + 1,
+            EntityCooccurrence.score: EntityCooccurrence.score + increment,
+            EntityCooccurrence.last_seen: when,
+        }
+        if existing:
+            self.db.query(EntityCooccurrence).filter(*pair_filter).update(bump, synchronize_session=False)
+
+        # 3. Insert the new pairs (savepoint trap again for concurrent writers)
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                if (a, b) in existing:
+                    continue
                 try:
                     with self.db.begin_nested():
-                        self.db.add(new_ent)
+                        self.db.add(EntityCooccurrence(entity_a_id=a, entity_b_id=b, count=1, score=increment, last_seen=when))
                         self.db.flush()
-                    entity_objects.append(new_ent)
                 except IntegrityError:
-                    concurrent_ent = self.db.query(Entity).filter(Entity.name == e_name).first()
-                    if concurrent_ent:
-                        entity_objects.append(concurrent_ent)
-                        
-        return entity_objects
+                    self.db.query(EntityCooccurrence).filter(
+                        EntityCooccurrence.entity_a_id == a, EntityCooccurrence.entity_b_id == b
+                    ).update(bump, synchronize_session=False)
+
+    def get_timeline(self, subject_type: str, granularity: str, start: datetime, end: datetime, subject_ids: Optional[List[int]] = None):
+        """
+        Range query over the rollup table. Returns (subject_id, bucket_start, mention_count) rows
+        ordered by time, so the caller can group them into one series per subject.
+        """
+        return self.db.execute(timeline_stmt(subject_type, granularity, start, end, subject_ids)).all()
+
+    def get_top_movers(self, subject_type: str, granularity: str, window: int = 7, k: int = 10, now: Optional[datetime] = None):
+        """
+        Compares the last `window` buckets against the `window` buckets before them and returns
+        the k subjects whose mention counts grew the most.
+        """
+        return self.db.execute(top_movers_stmt(subject_type, granularity, window, k, now)).all()
+
+    def geocode_pending_locations(self, geocoder, names: Optional[List[str]] = None, limit: int = 25):
+        """
+        Fills the geocode cache for locations that were never looked up.
+        Already-geocoded names cost nothing, so calling this repeatedly is cheap.
+        Stops at the first GeocoderUnavailable: that location stays pending for the next run,
+        and the rest of the batch is not sent to a geocoder that is down or rate limiting us.
+        """
+        query = self.db.query(Location).filter(Location.geocoded_at.is_(None))
+        if names is not None:
+            query = query.filter(Location.name.in_(names))
+        # Names that failed before go last, so one that keeps failing can't block the queue
+        pending = query.order_by(Location.geocode_failures, Location.id).limit(limit).all()
+
+        geocoded = 0
+        for loc in pending:
+            try:
+                result = geocoder.geocode(loc.name)
+            except GeocoderUnavailable:
+                # Already logged by the geocoder
+                loc.geocode_failures = (loc.geocode_failures or 0) + 1
+                self.db.commit()
+                break
+            if result:
+                loc.canonical_name = result.canonical_name
+                loc.latitude = result.latitude
+                loc.longitude = result.longitude
+            # Every resolver answered: stamp even a miss, so we don't hammer the geocoder for gibberish names.
+            loc.geocoded_at = datetime.utcnow()
+            # Commit one by one: a crash halfway through should not throw away the lookups already paid for.
+            self.db.commit()
+            geocoded += 1
+        return geocoded
+
+    def get_pending_location_names(self, briefing_ids: Optional[List[int]] = None, names: Optional[List[str]] = None) -> List[str]:
+        """Names among these briefings' locations (or these names) that the backfill has not geocoded yet."""
+        query = self.db.query(Location.name).filter(Location.geocoded_at.is_(None))
+        if briefing_ids:
+            query = query.join(BriefingLocations, BriefingLocations.location_id == Location.id).filter(
+                BriefingLocations.briefing_id.in_(briefing_ids)
+            )
+        if names:
+            query = query.filter(Location.name.in_(names))
+        return sorted({row.name for row in query.all()})
+
+    def get_map_markers(self, briefing_ids: Optional[List[int]] = None, names: Optional[List[str]] = None,
+                        bbox: Optional[Tuple[float, float, float, float]] = None):
+        """
+        Returns ready-to-plot markers for the locations of a set of briefings (or explicit names).
+        bbox is (min_lon, min_lat, max_lon, max_lat) and is applied in SQL.
+        """
+        if briefing_ids:
+            query = (
+                self.db.query(Location, BriefingLocations.briefing_id)
+                .join(BriefingLocations, BriefingLocations.location_id == Location.id)
+                .filter(BriefingLocations.briefing_id.in_(briefing_ids))
+            )
+        else:
+            # No briefings given: skip the join so a popular location doesn't drag in thousands of links.
+            query = self.db.query(Location, null().label("briefing_id"))
+        query = query.filter(Location.latitude.isnot(None), Location.longitude.isnot(None))
+        if names:
+            query = query.filter(Location.name.in_(names))
+        if bbox:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            query = query.filter(Location.latitude.between(min_lat, max_lat))
+            if min_lon <= max_lon:
+                query = query.filter(Location.longitude.between(min_lon, max_lon))
+            else:
+                # The box crosses the antimeridian (e.g. 170 -> -170), so it is two longitude ranges.
+                query = query.filter(or_(Location.longitude >= min_lon, Location.longitude <= max_lon))
+
+        markers = {}
+        for loc, briefing_id in query.all():
+            if loc.id not in markers:
+                markers[loc.id] = {
+                    "id": loc.id,
+                    "name": loc.name,
+                    "canonical_name": loc.canonical_name,
+                    "lat": loc.latitude,
+                    "lng": loc.longitude,
+                    "briefing_ids": []
+                }
+            if briefing_id is not None:
+                markers[loc.id]["briefing_ids"].append(briefing_id)
+        return list(markers.values())
+
+
+class AsyncCRUD:
+    """
+    Async twin of CRUD for the API routes. Every query is awaited on asyncpg,
+    so a slow report query never blocks other requests on the event loop.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_recent_briefings(self, limit: int = 10):
+        return (await self.db.scalars(recent_briefings_stmt(limit))).all()
+
+    async def get_briefing_payloads(self, briefing_ids: List[int]) -> dict:
+        if not briefing_ids:
+            return {}
+        payloads = (await self.db.scalars(payloads_stmt(briefing_ids))).all()
+        return {p.briefing_id: unpack_payload(p) for p in payloads}
+
+    async def get_entity_mentions(self):
+        return (await self.db.execute(entity_mentions_stmt())).all()
+
+    async def stream_briefing_export(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                     since_id: Optional[int] = None, include_raw: bool = False,
+                                     batch_size: int = 500) -> AsyncIterator[List[dict]]:
+        """
+        Yields the archive as lists of at most `batch_size` export records, oldest id first.
+        Briefings come off a server-side cursor (yield_per), and each batch gets its locations,
+        entities and (optionally) raw payloads in ONE query per relation, so memory holds a
+        single batch no matter how large the archive is.
+        """
+        result = await self.db.stream(
+            export_briefings_stmt(start, end, since_id).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            ids = [r.id for r in rows]
+            locations, entities = defaultdict(list), defaultdict(list)
+            for r in await self.db.execute(export_locations_stmt(ids)):
+                locations[r.briefing_id].append(r.name)
+            for r in await self.db.execute(export_entities_stmt(ids)):
+                entities[r.briefing_id].append({"name": r.name, "type": r.type})
+            payloads, no_payload = {}, {}
+            if include_raw:
+                payloads = {p.briefing_id: unpack_payload(p) for p in await self.db.execute(export_payloads_stmt(ids))}
+                no_payload = unpack_payload(None)
+            yield [
+                {
+                    "id": r.id,
+                    "topic": r.topic,
+                    "content": r.content,
+                    "created_at": r.created_at.isoformat() if r.created_at else None,
+                    "last_seen_at": r.last_seen_at.isoformat() if r.last_seen_at else None,
+                    "seen_count": r.seen_count,
+                    "locations": locations.get(r.id, []),
+                    "entities": entities.get(r.id, []),
+                    **payloads.get(r.id, no_payload),
+                }
+                for r in rows
+            ]
+
+    async def get_timeline(self, subject_type: str, granularity: str, start: datetime, end: datetime, subject_ids: Optional[List[int]] = None):
+        return (await self.db.execute(timeline_stmt(subject_type, granularity, start, end, subject_ids))).all()
+
+    async def get_top_movers(self, subject_type: str, granularity: str, window: int = 7, k: int = 10, now: Optional[datetime] = None):
+        return (await self.db.execute(top_movers_stmt(subject_type, granularity, window, k, now))).all()
+
+    async def get_subject_names(self, subject_type: str, subject_ids):
+        """Looks up display names (and entity types) for a set of rollup subject ids in one query."""
+        if not subject_ids:
+            return {}
+        rows = (await self.db.execute(subject_names_stmt(subject_type, subject_ids))).all()
+        return {r.id: {"name": r.name, "type": r.type} for r in rows}
+
+    async def get_forecast(self, content_hash: str) -> Optional[dict]:
+        row = await self.db.get(Forecast, content_hash)
+        if row is None:
+            return None
+        return {"optimistic": row.optimistic, "base_case": row.base_case, "pessimistic": row.pessimistic}
+
+    async def save_forecast(self, content_hash: str, forecast: dict, briefing_id: Optional[int] = None):
+        """Idempotent: two workers racing on the same context both end up with the same single row."""
+        self.db.add(Forecast(
+            content_hash=content_hash,
+            briefing_id=briefing_id,
+            optimistic=forecast.get("optimistic", ""),
+            base_case=forecast.get("base_case", ""),
+            pessimistic=forecast.get("pessimistic", ""),
+        ))
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
@@ -0,0 +1,188 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+# Hand-maintained synonyms for the names the LLM writes in a dozen different ways.
+# Keys and values are already normalized (lowercase, no punctuation).
+CANONICAL_ALIASES = {
+    "us": "united states",
+    "usa": "united states",
+    "united states of america": "united states",
+    "america": "united states",
+    "uk": "united kingdom",
+    "britain": "united kingdom",
+    "great britain": "united kingdom",
+    "prc": "china",
+    "peoples republic of china": "china",
+    "roc": "taiwan",
+    "republic of china": "taiwan",
+    "uae": "united arab emirates",
+    "ksa": "saudi arabia",
+    "dprk": "north korea",
+    "rok": "south korea",
+    "russian federation": "russia",
+    "bharat": "india",
+    "republic of india": "india",
+    "eu": "european union",
+    "un": "united nations",
+    "nato": "north atlantic treaty organization",
+}
+
+# Fuzzy matching is only for TYPOS of a known name, never for a different-but-similar name:
+# - long enough that one typo can't turn one country into another ("Iran" vs "Iraq" must NEVER merge)
+# - trigram-Jaccard above FUZZY_THRESHOLD just picks candidates ("Narendra Mody" scores 0.75)
+# - same number of words: "People's Liberation Army Navy" is not "People's Liberation Army" (0.83),
+#   nor "Central Military Commission of China" "Central Military Commission" (0.76)
+# - at most one edit per FUZZY_CHARS_PER_EDIT characters ("Indian Army" vs "Indian Navy" is 3 edits)
+# - numbers must match exactly ("Su-30" vs "Su-35")
+FUZZY_MIN_LENGTH = 6
+FUZZY_THRESHOLD = 0.72
+FUZZY_CHARS_PER_EDIT = 8
+
+# Legal suffixes that never change WHICH organization we mean
+CORPORATE_SUFFIXES = ("ltd", "limited", "inc", "corp", "corporation", "plc", "llc", "co")
+
+
+def normalize_entity_name(name: str) -> str:
+    """
+    "U.S." -> "united states", "The Pentagon" -> "pentagon", "Tata Advanced Systems Ltd." -> "tata advanced systems".
+    """
+    # Strip accents (e.g. "Türkiye" -> "turkiye") and lowercase
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    # Apostrophes and dots vanish ("U.S." -> "us", "People's" -> "peoples"), other punctuation is a space
+    text = re.sub(r"[.'`]", "", text)
+    text = re.sub(r"[^a-z0-9]+", " ", text).strip()
+    if text.startswith("the "):
+        text = text[4:]
+    words = text.split(" ")
+    while len(words) > 1 and words[-1] in CORPORATE_SUFFIXES:
+        words.pop()
+    text = " ".join(words)
+    return CANONICAL_ALIASES.get(text, text)
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, but stops counting at limit + 1 (we only need "small enough or not")."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def is_typo_variant(key: str, candidate: str) -> bool:
+    """True if two normalized keys plausibly name the SAME thing, one of them misspelt (see the rules above)."""
+    words, other = key.split(" "), candidate.split(" ")
+    if len(words) != len(other) or set(words) < set(other) or set(other) < set(words):
+        return False
+    if [w for w in words if any(c.isdigit() for c in w)] != [w for w in other if any(c.isdigit() for c in w)]:
+        return False
+    max_edits = min(len(key), len(candidate)) // FUZZY_CHARS_PER_EDIT
+    return max_edits > 0 and edit_distance(key, candidate, max_edits) <= max_edits
+
+
+class EntityAliasIndex:
+    """
+    Process-local map of normalized name -> (entity_id, type), with a trigram index for close variants.
+    Warmed once from Postgres; afterwards most saves resolve entities with zero name lookups.
+    Exact lookups are single dict reads (atomic in CPython). Everything that iterates the index
+    (fuzzy_lookup copies its trigram buckets) or mutates it takes the lock, because the API threads
+    and the scheduler thread save briefings at the same time.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Tuple[int, str]] = {}
+        self._trigrams = defaultdict(set)
+        self.warmed = False
+
+    def __len__(self):
+        return len(self._keys)
+
+    def warm(self, db):
+        """Loads every alias and entity name. Lowest id wins if old duplicates normalize to the same key."""
+        from .models import Entity, EntityAlias
+
+        rows = db.query(EntityAlias.alias, Entity.id, Entity.type).join(Entity, Entity.id == EntityAlias.entity_id).all()
+        rows += db.query(Entity.name, Entity.id, Entity.type).all()
+        with self._lock:
+            for alias, entity_id, entity_type in sorted(rows, key=lambda r: r[1]):
+                self._add(normalize_entity_name(alias), entity_id, entity_type)
+            self.warmed = True
+
+    def ensure_warm(self, db):
+        if not self.warmed:
+            self.warm(db)
+
+    def _add(self, key: str, entity_id: int, entity_type: str):
+        if not key or key in self._keys:
+            return
+        self._keys[key] = (entity_id, entity_type)
+        for gram in trigrams(key):
+            self._trigrams[gram].add(key)
+
+    def add(self, key: str, entity_id: int, entity_type: str):
+        with self._lock:
+            self._add(key, entity_id, entity_type)
+
+    def discard(self, key: str):
+        """Invalidates a key (e.g. it pointed at an entity that no longer exists)."""
+        with self._lock:
+            if self._keys.pop(key, None) is not None:
+                for gram in trigrams(key):
+                    self._trigrams[gram].discard(key)
+
+    def discard_entity(self, entity_id: int):
+        """Drops every key pointing at this entity (e.g. it was merged into another one)."""
+        with self._lock:
+            stale = [key for key, (eid, _) in self._keys.items() if eid == entity_id]
+            for key in stale:
+                del self._keys[key]
+                for gram in trigrams(key):
+                    self._trigrams[gram].discard(key)
+
+    def lookup(self, key: str) -> Optional[int]:
+        hit = self._keys.get(key)
+        return hit[0] if hit else None
+
+    def fuzzy_lookup(self, key: str, entity_type: str) -> Optional[Tuple[int, str]]:
+        """
+        Best trigram-Jaccard match of the SAME type that clears the threshold AND is_typo_variant() of key.
+        Returns (entity_id, matched_key).
+        """
+        if len(key) < FUZZY_MIN_LENGTH:
+            return None
+        grams = trigrams(key)
+        # Copy the buckets under the lock: add()/discard() resize these sets from other threads
+        with self._lock:
+            buckets = [tuple(self._trigrams.get(gram, ())) for gram in grams]
+        overlap = defaultdict(int)
+        for bucket in buckets:
+            for candidate in bucket:
+                overlap[candidate] += 1
+
+        best, best_score = None, FUZZY_THRESHOLD
+        for candidate, shared in overlap.items():
+            entity_id, candidate_type = self._keys.get(candidate, (None, None))
+            if entity_id is None or candidate_type != entity_type or len(candidate) < FUZZY_MIN_LENGTH:
+                continue
+            score = shared / (len(grams) + len(trigrams(candidate)) - shared)
+            if score >= best_score and is_typo_variant(key, candidate):
+                best, best_score = (entity_id, candidate), score
+        return best
+
+
+# Singleton shared by every CRUD in this process
+entity_index = EntityAliasIndex()
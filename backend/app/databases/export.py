@@ -0,0 +1,66 @@
+import os
+import json
+from typing import AsyncIterator, Callable, List, Optional
+
+import zstandard
+
+from .db_config import EXPORT_MAX_CONCURRENT
+
+# =========================================================
+# Archive Export
+# NDJSON, one briefing per line, encoded batch by batch as rows come off the
+# server-side cursor (see AsyncCRUD.stream_briefing_export). Nothing is buffered
+# beyond one batch, and the socket's backpressure throttles the cursor.
+# =========================================================
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))   # Rows per cursor fetch (and per join query)
+EXPORT_ZSTD_LEVEL = int(os.getenv("EXPORT_ZSTD_LEVEL", "3"))
+EXPORT_COMPRESSIONS = ("none", "zstd")
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[dict]], compression: str = "none") -> AsyncIterator[bytes]:
+    """
+    One chunk per batch. With zstd every chunk ends on a flushed block, so the client can
+    decompress what it has so far; the frame is closed after the last batch.
+    """
+    # One compressor per export: ZstdCompressor objects must not be shared between streams
+    compressor = zstandard.ZstdCompressor(level=EXPORT_ZSTD_LEVEL).compressobj() if compression == "zstd" else None
+    async for records in batches:
+        chunk = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        if compressor is not None:
+            chunk = compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if chunk:
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+class ExportSlots:
+    """
+    Counts running exports so a request beyond EXPORT_MAX_CONCURRENT gets an immediate 503
+    instead of waiting pool_timeout for an export connection. Lives on the event loop, no locks.
+    """
+    def __init__(self, limit: int = EXPORT_MAX_CONCURRENT):
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> Optional[Callable[[], None]]:
+        """
+        Takes a slot right away, in the request handler: check and increment happen with no await
+        in between, so two requests can never both pass the check for the last slot.
+        Returns an idempotent release(), or None when every slot is taken.
+        """
+        if self.active >= self.limit:
+            return None
+        self.active += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.active -= 1
+
+        return release
+
+
+export_slots = ExportSlots()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, UniqueConstraint, Index, Float, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .db_config import Base
@@ -8,9 +8,22 @@ class Briefing(Base):
     id = Column(Integer, primary_key=True, index=True)
     topic = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
-    scout_data = Column(Text, nullable=True)     # Added for Phase 7 Polish
-    scholar_data = Column(Text, nullable=True)   # Added for Phase 7 Polish
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # The raw scout/scholar blobs (Phase 7 Polish) now live compressed in BriefingPayload,
+    # so this "hot" table stays small enough for Postgres to keep it and its indexes in memory.
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # Near-duplicate suppression: 64-bit SimHash of `content` (stored signed, see app/fingerprint.py).
+    # When the autopilot produces the same briefing again we only bump these two columns.
+    simhash = Column(BigInteger, nullable=True)
+    seen_count = Column(Integer, nullable=False, default=1)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
+
+    # Graph run (checkpoint thread_id) that wrote this briefing. A run resumed after a failure
+    # replays database_writer; the unique index lets it find its own briefing instead of inserting again.
+    run_id = Column(Text, nullable=True, unique=True, index=True)
+
+    # Loaded ONLY when someone asks for it (see CRUD.get_briefing_payloads)
+    payload = relationship("BriefingPayload", uselist=False, back_populates="briefing")
     
     # We point directly to "Location" but tell SQLAlchemy to use the Association Table string as the bridge
     locations = relationship("Location", secondary="briefing_locations", back_populates="briefings")
@@ -18,6 +31,25 @@ class Briefing(Base):
     # Phase 8: Add many-to-many relationship to Entities
     entities = relationship("Entity", secondary="briefing_entities", back_populates="briefings")
 
+class BriefingPayload(Base):
+    """
+    Cold storage for the raw Scout/Scholar intel behind a briefing, zstd-compressed.
+    On Postgres the table is range-partitioned by month (see app/databases/retention.py),
+    so archiving an old month is a cheap DETACH/DROP instead of a huge DELETE.
+    """
+    __tablename__ = "briefing_payloads"
+    briefing_id = Column(Integer, ForeignKey("briefings.id", ondelete="CASCADE"), primary_key=True)
+    # Postgres requires the partition key to be part of the primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    scout_data = Column(LargeBinary, nullable=True)      # zstd-compressed JSON string
+    scholar_data = Column(LargeBinary, nullable=True)    # zstd-compressed text
+    raw_bytes = Column(Integer, nullable=False, default=0)         # Uncompressed size, to monitor the ratio
+    compressed_bytes = Column(Integer, nullable=False, default=0)
+
+    briefing = relationship("Briefing", back_populates="payload")
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
 class BriefingLocations(Base):
     __tablename__ = "briefing_locations"
     id = Column(Integer, primary_key=True, index=True)
@@ -30,6 +62,16 @@ class Location(Base):
     __tablename__ = "locations"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False,unique=True)
+
+    # Geocode cache: filled ONCE by the backend geocoder instead of by every browser on every render.
+    # geocoded_at is set when every resolver answered, even with "not found", so unresolvable names
+    # are not retried forever. When a resolver could not answer at all (outage, rate limit) the row
+    # stays pending and geocode_failures moves it to the back of the backfill queue.
+    canonical_name = Column(String(255), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geocoded_at = Column(DateTime, nullable=True)
+    geocode_failures = Column(Integer, nullable=False, default=0, server_default="0")
     
     # We point directly back to Briefing using the exact same bridge
     briefings = relationship("Briefing", secondary="briefing_locations", back_populates="locations")
@@ -59,4 +101,74 @@ class Entity(Base):
     briefings = relationship("Briefing", secondary="briefing_entities", back_populates="entities")
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    
\ No newline at end of file
+class EntityAlias(Base):
+    """
+    Every normalized spelling we have seen for an entity ("usa", "united states", ...).
+    Lets "USA", "U.S." and "United States" all resolve to ONE Entity row.
+    """
+    __tablename__ = "entity_aliases"
+    id = Column(Integer, primary_key=True, index=True)
+    alias = Column(String(255), nullable=False, unique=True)    # Output of normalize_entity_name()
+    entity_id = Column(Integer, ForeignKey("entities.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class EntityCooccurrence(Base):
+    """
+    How often two entities appeared in the same briefing (one row per unordered pair, a < b).
+    `score` is a time-decayed weight stored relative to a fixed epoch (see app/databases/cooccurrence.py),
+    which turns every update into a plain "score = score + x" that concurrent writers can't clobber.
+    """
+    __tablename__ = "entity_cooccurrences"
+    id = Column(Integer, primary_key=True, index=True)
+    entity_a_id = Column(Integer, ForeignKey("entities.id"), nullable=False)
+    entity_b_id = Column(Integer, ForeignKey("entities.id"), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    score = Column(Float, nullable=False, default=0.0)
+    last_seen = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("entity_a_id", "entity_b_id", name="uq_entity_pair"),
+        Index("ix_entity_cooccurrences_b", "entity_b_id"),
+    )
+
+# ==========================================
+# Timeline Rollups: Pre-aggregated Mention Buckets
+# ==========================================
+
+class MentionBucket(Base):
+    """
+    Stores how many briefings mentioned an entity or location inside one time bucket.
+    Rows are incremented by CRUD.save_briefing, so trend charts read a handful of
+    small rows instead of re-counting the whole briefing_entities table.
+    """
+    __tablename__ = "mention_buckets"
+    id = Column(Integer, primary_key=True, index=True)
+    subject_type = Column(String(20), nullable=False)   # 'entity' or 'location'
+    subject_id = Column(Integer, nullable=False)        # entities.id or locations.id
+    granularity = Column(String(10), nullable=False)    # 'hour', 'day' or 'week'
+    bucket_start = Column(DateTime, nullable=False)
+    mention_count = Column(Integer, nullable=False, default=0)
+
+    # The unique key is what makes the incremental upsert safe between concurrent writers.
+    # The second index serves range queries and the top-K movers scan.
+    __table_args__ = (
+        UniqueConstraint("subject_type", "subject_id", "granularity", "bucket_start", name="uq_mention_bucket"),
+        Index("ix_mention_buckets_range", "subject_type", "granularity", "bucket_start"),
+    )
+
+# ==========================================
+# Strategic Forecast Cache
+# ==========================================
+
+class Forecast(Base):
+    """
+    A generated strategic forecast, keyed by a hash of the exact context (plus model and prompt version).
+    Re-opening the same briefing serves this row instead of paying for three more LLM scenarios.
+    """
+    __tablename__ = "forecasts"
+    content_hash = Column(String(64), primary_key=True)
+    briefing_id = Column(Integer, ForeignKey("briefings.id", ondelete="SET NULL"), nullable=True, index=True)
+    optimistic = Column(Text)
+    base_case = Column(Text)
+    pessimistic = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
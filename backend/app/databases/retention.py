@@ -0,0 +1,357 @@
+import os
+import re
+import logging
+from itertools import groupby
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import text, inspect, select, update, delete, func, DateTime
+from sqlalchemy.engine import Engine
+
+from .models import (
+    Briefing, Location, Entity, EntityAlias, EntityCooccurrence, BriefingPayload, BriefingLocations,
+    BriefingEntities, MentionBucket,
+)
+from .compression import compress_text
+from .crud import BUCKET_STEPS, bucket_start
+from .cooccurrence import mention_score
+from .entity_index import normalize_entity_name
+
+logger = logging.getLogger(__name__)
+
+# 0 = keep raw payloads forever. Otherwise months older than this are archived.
+PAYLOAD_RETENTION_MONTHS = int(os.getenv("PAYLOAD_RETENTION_MONTHS", "0"))
+# "detach" keeps the old month as a standalone table (pg_dump it, then drop it yourself),
+# "drop" deletes it outright.
+PAYLOAD_ARCHIVE_MODE = os.getenv("PAYLOAD_ARCHIVE_MODE", "detach")
+PARTITION_PREFIX = "briefing_payloads_p"
+
+
+def _month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def _add_months(ts: datetime, months: int) -> datetime:
+    index = ts.year * 12 + (ts.month - 1) + months
+    return ts.replace(year=index // 12, month=index % 12 + 1)
+
+def _is_postgres(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def ensure_payload_partitions(engine: Engine, months_ahead: int = 2, now: datetime = None, since: datetime = None):
+    """
+    Creates the monthly partitions for this month and the next few, plus a DEFAULT catch-all.
+    `since` also creates every month from then on (used before copying historical payloads in).
+    Rows that already sit in the DEFAULT partition are moved into monthly ones, because retention
+    can only archive monthly partitions.
+    Idempotent, so it is safe to run on every boot and from the daily scheduler job.
+    """
+    if not _is_postgres(engine):
+        return
+    month = _month_start(now or datetime.utcnow())
+    first = min(_month_start(since), month) if since else month
+    with engine.begin() as conn:
+        # Rows outside every monthly range (e.g. a backfilled old briefing) land here instead of erroring
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {PARTITION_PREFIX}default PARTITION OF briefing_payloads DEFAULT"))
+        # First: a month can only be created once the DEFAULT partition holds none of its rows
+        _split_default_partition(conn)
+        lower = first
+        while lower <= _add_months(month, months_ahead):
+            upper = _add_months(lower, 1)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {PARTITION_PREFIX}{lower:%Y%m} PARTITION OF briefing_payloads "
+                f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            ))
+            lower = upper
+
+
+def _split_default_partition(conn):
+    """
+    Moves DEFAULT-partition rows into monthly partitions: build the month as a plain table, move its rows,
+    then ATTACH it (Postgres refuses to create a partition whose range still has rows in DEFAULT).
+    """
+    months = conn.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at) FROM {PARTITION_PREFIX}default"
+    )).scalars().all()
+    for lower in sorted(months):
+        upper = _add_months(lower, 1)
+        name = f"{PARTITION_PREFIX}{lower:%Y%m}"
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            # A detached archive of that month still exists; leave the rows for whoever restores it
+            logger.warning(f"⚠️ RETENTION: {name} exists outside briefing_payloads; its rows stay in the DEFAULT partition")
+            continue
+        bounds = {"lower": lower, "upper": upper}
+        conn.execute(text(f"CREATE TABLE {name} (LIKE briefing_payloads INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(text(
+            f"INSERT INTO {name} SELECT * FROM {PARTITION_PREFIX}default "
+            f"WHERE created_at >= :lower AND created_at < :upper"
+        ), bounds)
+        conn.execute(text(
+            f"DELETE FROM {PARTITION_PREFIX}default WHERE created_at >= :lower AND created_at < :upper"
+        ), bounds)
+        conn.execute(text(
+            f"ALTER TABLE briefing_payloads ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        ))
+        logger.info(f"🗄️ RETENTION: Moved {lower:%Y-%m} payloads out of the DEFAULT partition into {name}")
+
+
+def archive_old_payloads(engine: Engine, retention_months: int = PAYLOAD_RETENTION_MONTHS,
+                         mode: str = PAYLOAD_ARCHIVE_MODE, now: datetime = None) -> list:
+    """
+    Archives raw payloads older than `retention_months`. The briefings themselves stay.
+    On Postgres a whole month goes at once (DETACH/DROP PARTITION: instant, no table bloat, no vacuum).
+    Elsewhere we fall back to a plain DELETE.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(now or datetime.utcnow()), -retention_months)
+
+    if not _is_postgres(engine):
+        with engine.begin() as conn:
+            conn.execute(delete(BriefingPayload).where(BriefingPayload.created_at < cutoff))
+        return []
+
+    archived = []
+    with engine.begin() as conn:
+        partitions = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'briefing_payloads'"
+        )).scalars().all()
+        for name in partitions:
+            match = re.fullmatch(rf"{PARTITION_PREFIX}(\d{{4}})(\d{{2}})", name)
+            if not match:
+                continue   # Skip the DEFAULT partition
+            month = datetime(int(match.group(1)), int(match.group(2)), 1)
+            if _add_months(month, 1) > cutoff:
+                continue
+            if mode == "drop":
+                conn.execute(text(f"DROP TABLE {name}"))
+            else:
+                conn.execute(text(f"ALTER TABLE briefing_payloads DETACH PARTITION {name}"))
+            archived.append(name)
+    if archived:
+        logger.info(f"🗄️ RETENTION: {mode} {len(archived)} payload partitions: {archived}")
+    return archived
+
+
+def _add_missing_columns(engine: Engine, model, column_names) -> list:
+    """
+    create_all() never alters an existing table, so columns added to a model later are added here.
+    Types and server defaults come from the model, compiled for the current dialect. Idempotent.
+    """
+    table = model.__table__
+    existing = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    added = []
+    with engine.begin() as conn:
+        for name in column_names:
+            if name in existing:
+                continue
+            column = table.columns[name]
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=engine.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            conn.execute(text(ddl))
+            added.append(name)
+    if added:
+        logger.info(f"🗄️ MIGRATION: Added {table.name} columns {added}")
+    return added
+
+
+def migrate_location_geocode_columns(engine: Engine):
+    """
+    Databases created before the geocode cache lack these columns. Added empty (NULL = never geocoded),
+    so the scheduler's backfill then resolves every existing location once.
+    """
+    _add_missing_columns(engine, Location, ["canonical_name", "latitude", "longitude", "geocoded_at", "geocode_failures"])
+
+
+def migrate_briefing_dedup_columns(engine: Engine):
+    """
+    Databases created before near-duplicate suppression lack simhash/seen_count/last_seen_at.
+    Existing briefings count as seen once, last at creation; simhash stays NULL (never matched).
+    """
+    added = _add_missing_columns(engine, Briefing, ["simhash", "seen_count", "last_seen_at"])
+    with engine.begin() as conn:
+        # Also covers a crash between the ALTER and this backfill on a previous start
+        conn.execute(update(Briefing).where(Briefing.seen_count.is_(None)).values(seen_count=1))
+        conn.execute(update(Briefing).where(Briefing.last_seen_at.is_(None)).values(last_seen_at=Briefing.created_at))
+        if "seen_count" in added and _is_postgres(engine):
+            conn.execute(text("ALTER TABLE briefings ALTER COLUMN seen_count SET NOT NULL"))
+
+
+def migrate_briefing_run_id_column(engine: Engine):
+    """
+    Databases created before resumable runs lack briefings.run_id. Old briefings keep NULL
+    (the unique index allows any number of those).
+    """
+    _add_missing_columns(engine, Briefing, ["run_id"])
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_briefings_run_id ON briefings (run_id)"))
+
+
+def migrate_inline_payloads(engine: Engine, batch_size: int = 500):
+    """
+    One-time upgrade for databases created before payloads moved out of `briefings`:
+    compress the old scout_data/scholar_data columns into briefing_payloads, then drop them.
+    Does nothing once the columns are gone.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns("briefings")}
+    if "scout_data" not in columns and "scholar_data" not in columns:
+        return
+
+    logger.info("🗄️ MIGRATION: Moving inline briefing payloads into compressed cold storage...")
+    # Give every historical month its own partition first, or it all lands in DEFAULT, which retention never archives
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(Briefing.created_at))).scalar()
+    ensure_payload_partitions(engine, since=oldest)
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, created_at, scout_data, scholar_data FROM briefings "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ).columns(created_at=DateTime), {"last_id": last_id, "limit": batch_size}).all()
+            if not rows:
+                break
+            existing = set(conn.execute(
+                select(BriefingPayload.briefing_id).where(BriefingPayload.briefing_id.in_([r.id for r in rows]))
+            ).scalars())
+            values = []
+            for r in rows:
+                if r.id in existing or (r.scout_data is None and r.scholar_data is None):
+                    continue
+                scout_blob, scholar_blob = compress_text(r.scout_data), compress_text(r.scholar_data)
+                values.append({
+                    "briefing_id": r.id,
+                    "created_at": r.created_at or datetime.utcnow(),
+                    "scout_data": scout_blob,
+                    "scholar_data": scholar_blob,
+                    "raw_bytes": len((r.scout_data or "").encode()) + len((r.scholar_data or "").encode()),
+                    "compressed_bytes": len(scout_blob or b"") + len(scholar_blob or b""),
+                })
+            if values:
+                conn.execute(BriefingPayload.__table__.insert(), values)
+            last_id = rows[-1].id
+
+    with engine.begin() as conn:
+        for col in ("scout_data", "scholar_data"):
+            if col in columns:
+                conn.execute(text(f"ALTER TABLE briefings DROP COLUMN {col}"))
+    logger.info("✅ MIGRATION: Inline payloads moved.")
+
+
+def backfill_mention_buckets(engine: Engine, batch_size: int = 5000):
+    """
+    Rebuilds the timeline rollups from briefing_locations/briefing_entities when they don't account
+    for every mention, e.g. an archive saved before mention_buckets existed. Each briefing adds exactly
+    one mention per subject to its day bucket, so comparing the two totals is enough.
+    Does nothing once they match.
+    """
+    sources = {
+        "location": (BriefingLocations, BriefingLocations.location_id),
+        "entity": (BriefingEntities, BriefingEntities.entity_id),
+    }
+    for subject_type, (table, subject_column) in sources.items():
+        pairs = (
+            select(table.briefing_id, subject_column.label("subject_id"), Briefing.created_at)
+            .join(Briefing, Briefing.id == table.briefing_id)
+            .where(subject_column.isnot(None), Briefing.created_at.isnot(None))
+            .distinct()
+        )
+        with engine.connect() as conn:
+            expected = conn.execute(select(func.count()).select_from(pairs.subquery())).scalar()
+            recorded = conn.execute(
+                select(func.coalesce(func.sum(MentionBucket.mention_count), 0)).where(
+                    MentionBucket.subject_type == subject_type, MentionBucket.granularity == "day"
+                )
+            ).scalar()
+        if expected == recorded:
+            continue
+
+        logger.info(f"🗄️ MIGRATION: Rebuilding {subject_type} timeline rollups ({recorded} of {expected} mentions counted)...")
+        counts = defaultdict(int)
+        with engine.connect() as conn:
+            for row in conn.execution_options(yield_per=batch_size).execute(pairs):
+                for granularity in BUCKET_STEPS:
+                    counts[(granularity, bucket_start(row.created_at, granularity), row.subject_id)] += 1
+        values = [
+            {"subject_type": subject_type, "subject_id": subject_id, "granularity": granularity,
+             "bucket_start": start, "mention_count": count}
+            for (granularity, start, subject_id), count in counts.items()
+        ]
+        # Replaced in ONE transaction, so the API never sees a half-built timeline
+        with engine.begin() as conn:
+            conn.execute(delete(MentionBucket).where(MentionBucket.subject_type == subject_type))
+            for i in range(0, len(values), batch_size):
+                conn.execute(MentionBucket.__table__.insert(), values[i:i + batch_size])
+        logger.info(f"✅ MIGRATION: {len(values)} {subject_type} buckets rebuilt.")
+
+
+def merge_duplicate_entities(engine: Engine, batch_size: int = 5000) -> int:
+    """
+    Entities saved before the alias table existed can be split across spellings ("USA", "U.S.").
+    Folds every group with the same normalized name into its lowest id (the one EntityAliasIndex.warm
+    prefers): links and aliases move to it, the duplicates are deleted, and the co-occurrence pairs and
+    entity rollups are recomputed (the latter by backfill_mention_buckets, which must run afterwards).
+    Does nothing once every normalized name has a single row.
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(select(Entity.id, Entity.name).order_by(Entity.id)).all()
+    survivors, merges = {}, {}   # key -> lowest id, duplicate id -> survivor id
+    for row in rows:
+        key = normalize_entity_name(row.name)
+        if not key:
+            continue
+        if key in survivors:
+            merges[row.id] = survivors[key]
+        else:
+            survivors[key] = row.id
+    if not merges:
+        return 0
+
+    logger.info(f"🗄️ MIGRATION: Merging {len(merges)} duplicate entities into their canonical rows...")
+    with engine.begin() as conn:
+        for duplicate, survivor in merges.items():
+            # A briefing that mentioned both spellings keeps ONE link
+            already_linked = select(BriefingEntities.briefing_id).where(BriefingEntities.entity_id == survivor)
+            conn.execute(delete(BriefingEntities).where(
+                BriefingEntities.entity_id == duplicate, BriefingEntities.briefing_id.in_(already_linked)
+            ))
+            conn.execute(update(BriefingEntities).where(BriefingEntities.entity_id == duplicate).values(entity_id=survivor))
+            conn.execute(update(EntityAlias).where(EntityAlias.entity_id == duplicate).values(entity_id=survivor))
+        conn.execute(delete(MentionBucket).where(MentionBucket.subject_type == "entity"))
+        _rebuild_cooccurrences(conn, batch_size)
+        conn.execute(delete(Entity).where(Entity.id.in_(list(merges))))
+    logger.info(f"✅ MIGRATION: {len(merges)} duplicate entities merged.")
+    return len(merges)
+
+
+def _rebuild_cooccurrences(conn, batch_size: int):
+    """Recomputes entity_cooccurrences from briefing_entities, with the same scores record_cooccurrences writes."""
+    links = conn.execution_options(yield_per=batch_size).execute(
+        select(BriefingEntities.briefing_id, BriefingEntities.entity_id, Briefing.created_at)
+        .join(Briefing, Briefing.id == BriefingEntities.briefing_id)
+        .where(BriefingEntities.entity_id.isnot(None), Briefing.created_at.isnot(None))
+        .order_by(BriefingEntities.briefing_id)
+    )
+    pairs = {}   # (a, b) -> [count, score, last_seen]
+    for _, group in groupby(links, key=lambda r: r.briefing_id):
+        group = list(group)
+        when = group[0].created_at
+        ids = sorted({r.entity_id for r in group})
+        increment = mention_score(when)
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                pair = pairs.setdefault((a, b), [0, 0.0, when])
+                pair[0] += 1
+                pair[1] += increment
+                pair[2] = max(pair[2], when)
+    conn.execute(delete(EntityCooccurrence))
+    values = [
+        {"entity_a_id": a, "entity_b_id": b, "count": count, "score": score, "last_seen": last_seen}
+        for (a, b), (count, score, last_seen) in pairs.items()
+    ]
+    for i in range(0, len(values), batch_size):
+        conn.execute(EntityCooccurrence.__table__.insert(), values[i:i + batch_size])
@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+from collections import deque, defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+import mmh3
+import numpy as np
+
+# Two briefings whose 64-bit SimHashes differ in at most this many bits are "the same briefing".
+# Unrelated texts land around 32 bits apart; the chance of two of them falling within 6 is ~1e-11.
+DEDUP_MAX_HAMMING = int(os.getenv("DEDUP_MAX_HAMMING", "6"))
+# Only compare against briefings from this recent window (the autopilot repeats itself cycle after cycle,
+# but the same words a month later are genuinely a new report).
+DEDUP_WINDOW_HOURS = float(os.getenv("DEDUP_WINDOW_HOURS", "24"))
+SHINGLE_SIZE = 3
+
+_WORD = re.compile(r"\w+")
+_BIT_POSITIONS = np.arange(64, dtype=np.uint64)
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over 3-word shingles. Similar texts -> fingerprints that differ in only a few bits.
+    Vectorized with numpy: every shingle hash is unpacked into 64 bits in one shot.
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return 0
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))]
+    hashes = np.array([mmh3.hash64(s, signed=False)[0] for s in shingles], dtype=np.uint64)
+    bits = (hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)
+    # Each bit "votes" +1 if set, -1 if not; the fingerprint keeps the majority
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int(sum(1 << i for i in range(64) if votes[i] > 0))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def to_signed64(value: int) -> int:
+    """Postgres BIGINT is signed, our fingerprints are unsigned."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def to_unsigned64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over recent briefing fingerprints.
+    The 64 bits are cut into (max_distance + 1) bands. If two fingerprints differ in at most
+    max_distance bits, at least ONE band must be identical (pigeonhole), so we only compare
+    against briefings sharing a band: a handful of dict lookups instead of scanning everything.
+    """
+    def __init__(self, max_distance: int = DEDUP_MAX_HAMMING, window: timedelta = timedelta(hours=DEDUP_WINDOW_HOURS)):
+        self.max_distance = max_distance
+        self.window = window
+        self.bands = max_distance + 1
+        self.band_width = 64 // self.bands
+        self._lock = threading.Lock()
+        self._buckets = defaultdict(set)     # (band_no, band_value) -> {briefing_id}
+        self._fingerprints = {}              # briefing_id -> (fingerprint, created_at)
+        self._order = deque()                # (created_at, briefing_id), oldest first, for eviction
+        self.warmed = False
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self.band_width) - 1
+        return [(i, (fingerprint >> (i * self.band_width)) & mask) for i in range(self.bands)]
+
+    def _evict(self, now: datetime):
+        cutoff = now - self.window
+        while self._order and self._order[0][0] < cutoff:
+            _, briefing_id = self._order.popleft()
+            entry = self._fingerprints.pop(briefing_id, None)
+            if entry is not None:
+                for key in self._band_keys(entry[0]):
+                    self._buckets[key].discard(briefing_id)
+
+    def add(self, briefing_id: int, fingerprint: int, created_at: datetime):
+        with self._lock:
+            if briefing_id in self._fingerprints:
+                return
+            self._fingerprints[briefing_id] = (fingerprint, created_at)
+            self._order.append((created_at, briefing_id))
+            for key in self._band_keys(fingerprint):
+                self._buckets[key].add(briefing_id)
+            self._evict(datetime.utcnow())
+
+    def find(self, fingerprint: int, now: Optional[datetime] = None) -> Optional[int]:
+        """Returns the newest recent briefing id within max_distance bits, or None."""
+        now = now or datetime.utcnow()
+        cutoff = now - self.window
+        with self._lock:
+            self._evict(now)
+            candidates = set()
+            for key in self._band_keys(fingerprint):
+                candidates |= self._buckets.get(key, set())
+            matches = [
+                bid for bid in candidates
+                # Eviction is by insertion order, so double-check the age of out-of-order entries
+                if self._fingerprints[bid][1] >= cutoff and hamming(fingerprint, self._fingerprints[bid][0]) <= self.max_distance
+            ]
+            return max(matches) if matches else None
+
+    def warm(self, db):
+        from app.databases.crud import CRUD
+
+        since = datetime.utcnow() - self.window
+        for briefing_id, fingerprint, created_at in CRUD(db).get_recent_fingerprints(since):
+            self.add(briefing_id, to_unsigned64(fingerprint), created_at)
+        self.warmed = True
+
+
+# Singleton shared by the graph nodes (API thread + scheduler thread)
+near_duplicates = NearDuplicateIndex()
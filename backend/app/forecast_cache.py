@@ -0,0 +1,122 @@
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from app.databases.crud import AsyncCRUD
+from app.databases.db_config import AsyncSessionLocal
+from app.telemetry import record_cache
+
+logger = logging.getLogger(__name__)
+
+# How many forecasts to keep in process memory (each is a few KB of text)
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "256"))
+# "false" keeps the cache in memory only (lost on restart, never touches the database)
+FORECAST_CACHE_PERSIST = os.getenv("FORECAST_CACHE_PERSIST", "true").lower() == "true"
+# Bump whenever the strategist prompts change, so old answers stop matching
+FORECAST_PROMPT_VERSION = "v1"
+
+
+def forecast_key(context: str, model_name: str, mode: str) -> str:
+    """Same briefing text + same model + same prompts + same mode = same forecast."""
+    # "single" and "parallel" use different prompts, so their answers must not be served for each other
+    raw = f"{FORECAST_PROMPT_VERSION}|{model_name}|{mode}|{context.strip()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_complete(forecast: dict) -> bool:
+    # A failed scenario comes back as "", and we never want to cache a failure
+    return all(forecast.get(name) for name in ("optimistic", "base_case", "pessimistic"))
+
+
+class ForecastCache:
+    """
+    Two-level cache for strategist forecasts: an LRU dict in front of the `forecasts` table.
+    Concurrent requests for the same key share ONE generation (single-flight) instead of
+    each paying for their own LLM calls.
+    """
+    def __init__(self, max_size: int = FORECAST_CACHE_SIZE, persist: bool = FORECAST_CACHE_PERSIST):
+        self.max_size = max_size
+        self.persist = persist
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._inflight = {}     # key -> asyncio.Future
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, forecast: dict):
+        self._memory[key] = forecast
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[dict]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            record_cache("forecast", True)
+            return self._memory[key]
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    stored = await AsyncCRUD(db).get_forecast(key)
+            except Exception as e:
+                logger.warning(f"⚠️ FORECAST CACHE: Lookup failed, generating instead: {e}")
+                stored = None
+            if stored is not None:
+                self._remember(key, stored)
+                self.hits += 1
+                record_cache("forecast", True)
+                return stored
+        self.misses += 1
+        record_cache("forecast", False)
+        return None
+
+    async def put(self, key: str, forecast: dict, briefing_id: Optional[int] = None):
+        if not is_complete(forecast):
+            return
+        self._remember(key, forecast)
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await AsyncCRUD(db).save_forecast(key, forecast, briefing_id)
+            except Exception as e:
+                logger.warning(f"⚠️ FORECAST CACHE: Could not persist forecast: {e}")
+
+    async def _generate(self, key: str, compute: Callable[[], Awaitable[dict]], briefing_id: Optional[int]) -> dict:
+        try:
+            forecast = await compute()
+            await self.put(key, forecast, briefing_id)
+            return forecast
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[dict]],
+                             briefing_id: Optional[int] = None):
+        """
+        Returns (forecast, cached). `cached` is True only when the forecast came out of the cache;
+        callers that joined a generation already in flight got a fresh forecast and see False.
+        The generation runs as its own task, so a caller going away (even the one that started it)
+        neither cancels it for the others nor wastes the LLM calls already paid for.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached, True
+        task = self._inflight.get(key)
+        if task is None:
+            if key in self._memory:
+                # Finished while get() was waiting on the database
+                return self._memory[key], True
+            task = self._inflight[key] = asyncio.ensure_future(self._generate(key, compute, briefing_id))
+            # Retrieve the outcome even if every caller has gone, so asyncio doesn't log "exception never retrieved"
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task), False
+
+    def stats(self) -> dict:
+        return {"size": len(self._memory), "max_size": self.max_size, "hits": self.hits,
+                "misses": self.misses, "persist": self.persist}
+
+
+# Singleton used by the forecast routes
+forecast_cache = ForecastCache()
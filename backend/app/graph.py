@@ -1,12 +1,19 @@
 from typing import TypedDict, Annotated, Sequence, List
 import operator
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
-from langchain_groq import ChatGroq
 from pydantic import BaseModel, Field
 import json
+import logging
 from app.databases.crud import CRUD
 from app.databases.db_config import SessionLocal
+from app.live_feed import live_feed, briefing_event
+from app.fingerprint import simhash, near_duplicates, to_signed64
+from app.telemetry import traced_node, record_cache
+from app.providers import make_llm
+from app.checkpointing import make_checkpointer, run_id
+from app.batching import memoized, batch_memo, normalize_query
 
 # Import our Agents
 from app.agents.scholar import ScholarAgent
@@ -37,16 +44,26 @@ class AgentState(TypedDict):
     final_topic: str       # To pass from synthesizer to DB node
     final_content: str     # To pass from synthesizer to DB and Entity node
     entities: dict         # Contains people, organizations, countries
+    fingerprint: int       # SimHash of final_content (unsigned 64-bit)
+    duplicate_of: int      # Id of a recent near-identical briefing, if any
+
+logger = logging.getLogger(__name__)
 
 # 2. Initialize Tools & LLM
-llm = ChatGroq(model_name="llama-3.1-8b-instant")
+# Every node below is wrapped in @traced_node: one span + one latency sample per execution (see app/telemetry.py)
+# Nodes that take a `config` share their work with the other runs of a batch (see app/batching.py)
+llm = make_llm("graph")
 scholar = ScholarAgent()
 scout = ScoutAgent()
 cartographer = CartographerAgent()
 entity_extractor = EntityExtractorAgent()
 
 # 3. Define the Nodes (The Workers)
-def guard_node(state: AgentState):
+def _conversation_key(state: AgentState) -> tuple:
+    return tuple(normalize_query(str(m.content)) for m in state['messages'])
+
+@traced_node("guard")
+def guard_node(state: AgentState, config: RunnableConfig):
     """
     Acts as a firewall. Rejects non-defense/geopolitical queries.
     """
@@ -61,7 +78,7 @@ def guard_node(state: AgentState):
     # FIX: Pass the entire conversation history to the Guard so it understands context like "is it complete?"
     messages = [SystemMessage(content=system_prompt)] + list(state['messages'])
     
-    response = llm.invoke(messages)
+    response = memoized(config, "classification", ("guard", _conversation_key(state)), lambda: llm.invoke(messages))
     decision = response.content.strip().upper()
     
     if "REJECTED" in decision:
@@ -72,7 +89,8 @@ def guard_node(state: AgentState):
         
     return {"is_allowed": "yes"}
 
-def router_node(state: AgentState):
+@traced_node("router")
+def router_node(state: AgentState, config: RunnableConfig):
     """
     The 'Commander'. Uses an LLM to decide the next step.
     """
@@ -89,7 +107,7 @@ def router_node(state: AgentState):
     # FIX: Pass the entire conversation history to the Router
     messages = [SystemMessage(content=system_prompt)] + list(state['messages'])
     
-    response = llm.invoke(messages)
+    response = memoized(config, "classification", ("router", _conversation_key(state)), lambda: llm.invoke(messages))
     decision = response.content.strip().lower()
     
     # Fallback in case LLM chats instead of outputting a label
@@ -97,24 +115,32 @@ def router_node(state: AgentState):
     if "scholar" in decision: return {"next": "scholar"}
     return {"next": "both"}
 
-def scout_node(state: AgentState):
+@traced_node("scout")
+def scout_node(state: AgentState, config: RunnableConfig):
     """
     Executes a web search.
     """
     query = state['messages'][-1].content
-    results = scout.search(query)
+    results = memoized(config, "search", normalize_query(query), lambda: scout.search(query))
     
     # Return valid JSON string instead of Python string representation
     return {"scout_data": json.dumps(results)}
 
-def scholar_node(state: AgentState):
+@traced_node("scholar")
+def scholar_node(state: AgentState, config: RunnableConfig):
     """
     Queries the vector database.
     """
     query = state['messages'][-1].content
-    results = scholar.query(query)
+    memo = batch_memo(config)
+    if memo is not None and scholar.vector_store is not None:
+        # In a batch, the first scholar embeds every query at once; the rest reuse those vectors
+        results = scholar.query(query, embedding=memo.embedding(query, scholar.embed_queries))
+    else:
+        results = scholar.query(query)
     return {"scholar_data": str(results)}
 
+@traced_node("cartographer")
 def cartographer_node(state: AgentState):
     """
     Extracts geographic locations from the query.
@@ -124,6 +150,7 @@ def cartographer_node(state: AgentState):
     locations = cartographer.extract_locations(query)
     return {"locations": locations}
 
+@traced_node("synthesizer")
 def synthesizer_node(state: AgentState):
     """
     Combines intel from Scout and Scholar into a final briefing.
@@ -167,6 +194,33 @@ def synthesizer_node(state: AgentState):
         "messages": [AIMessage(content=final_content)]
     }
 
+@traced_node("fingerprint")
+def fingerprint_node(state: AgentState):
+    """
+    SimHashes the synthesized briefing and checks it against recent briefings.
+    Cheap (no LLM, no DB), and it lets us skip the Entity Extractor LLM call and the DB write
+    when the autopilot just produced the same report again.
+    """
+    if not near_duplicates.warmed:
+        with SessionLocal() as db:
+            near_duplicates.warm(db)
+    fingerprint = simhash(state.get("final_content", ""))
+    duplicate_of = near_duplicates.find(fingerprint)
+    record_cache("near_duplicate", duplicate_of is not None)
+    return {"fingerprint": fingerprint, "duplicate_of": duplicate_of}
+
+@traced_node("duplicate_recorder")
+def duplicate_recorder_node(state: AgentState):
+    """
+    Near-duplicate found: just attach the new timestamp to the existing briefing.
+    """
+    with SessionLocal() as db:
+        found = CRUD(db).record_repeat_sighting(state["duplicate_of"])
+    if not found:
+        logger.warning(f"⚠️ [DEDUP] Briefing {state['duplicate_of']} vanished; the repeat was not recorded.")
+    return {}
+
+@traced_node("entity_extractor")
 def entity_extractor_node(state: AgentState):
     """
     Extracts structured entities from the final synthesized briefing.
@@ -175,9 +229,12 @@ def entity_extractor_node(state: AgentState):
     entities = entity_extractor.extract(content)
     return {"entities": entities}
 
-def database_writer_node(state: AgentState):
+@traced_node("database_writer")
+def database_writer_node(state: AgentState, config: RunnableConfig):
     """
     Saves the completely constructed state to PostgreSQL.
+    Idempotent per run: if this node failed AFTER the commit and the run is resumed, the briefing
+    saved the first time is found by run_id and only the steps after the commit are redone.
     """
     places_found = state.get("locations", [])
     topic = state.get("final_topic", "General Briefing")
@@ -185,17 +242,32 @@ def database_writer_node(state: AgentState):
     scout_data = state.get('scout_data')
     scholar_data = state.get('scholar_data')
     entities = state.get('entities', {})
+    fingerprint = state.get('fingerprint')
+
+    run = run_id(config) if "thread_id" in (config or {}).get("configurable", {}) else None
 
     with SessionLocal() as db:
         crud = CRUD(db)
-        crud.save_briefing(
-            topic=topic, 
-            content=content, 
-            locations=places_found,
-            scout_data=scout_data,
-            scholar_data=scholar_data,
-            entities=entities
-        )
+        briefing = crud.get_briefing_by_run(run) if run else None
+        if briefing is not None:
+            logger.info(f"♻️ [DB WRITER] {run} already saved briefing {briefing.id}; not inserting it again")
+        else:
+            briefing = crud.save_briefing(
+                topic=topic, 
+                content=content, 
+                locations=places_found,
+                scout_data=scout_data,
+                scholar_data=scholar_data,
+                entities=entities,
+                simhash=to_signed64(fingerprint) if fingerprint is not None else None,
+                run_id=run
+            )
+        if fingerprint is not None:
+            near_duplicates.add(briefing.id, fingerprint, briefing.created_at)
+        # Build the payload while the session is still open (locations/entities are lazy-loaded),
+        # then push it to every connected dashboard. Only AFTER the commit, so nobody sees a ghost briefing.
+        event = briefing_event(briefing)
+    live_feed.publish(event)
     return {}
 
 # 4. Build the Graph
@@ -207,6 +279,8 @@ workflow.add_node("scout", scout_node)
 workflow.add_node("scholar", scholar_node)
 workflow.add_node('cartographer', cartographer_node)
 workflow.add_node("synthesizer", synthesizer_node)
+workflow.add_node("fingerprint", fingerprint_node)
+workflow.add_node("duplicate_recorder", duplicate_recorder_node)
 workflow.add_node("entity_extractor", entity_extractor_node)
 workflow.add_node("database_writer", database_writer_node)
 
@@ -233,9 +307,26 @@ workflow.add_edge("scout", "synthesizer")
 workflow.add_edge("scholar", "synthesizer")
 workflow.add_edge("cartographer", "synthesizer")
 
-# The final pipeline flow: Synthesize -> Extract Entities -> Save to DB -> End
-workflow.add_edge("synthesizer", "entity_extractor")
+def check_duplicate(state: AgentState):
+    if state.get("duplicate_of"):
+        return "duplicate"
+    return "new"
+
+# The final pipeline flow: Synthesize -> Fingerprint -> Extract Entities -> Save to DB -> End
+# ...unless the fingerprint says we've seen this briefing already: then only record the repeat.
+workflow.add_edge("synthesizer", "fingerprint")
+workflow.add_conditional_edges(
+    "fingerprint",
+    check_duplicate,
+    {
+        "duplicate": "duplicate_recorder",
+        "new": "entity_extractor"
+    }
+)
+workflow.add_edge("duplicate_recorder", END)
 workflow.add_edge("entity_extractor", "database_writer")
 workflow.add_edge("database_writer", END)
 
-app = workflow.compile()
+# Checkpointed after every superstep, so a failed run can resume at the failed node (see app/checkpointing.py).
+# Callers must pass a config with a thread_id: use checkpointing.new_run_config().
+app = workflow.compile(checkpointer=make_checkpointer())
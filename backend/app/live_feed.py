@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import select
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from app.databases.db_config import DATABASE_URL, to_libpq_url
+
+logger = logging.getLogger(__name__)
+
+# "memory"   -> events fan out inside this process only (single uvicorn worker).
+# "postgres" -> events go through LISTEN/NOTIFY so every worker's dashboards see every briefing.
+LIVE_FEED_BACKEND = os.getenv(
+    "LIVE_FEED_BACKEND",
+    "postgres" if DATABASE_URL.startswith("postgresql") else "memory"
+)
+NOTIFY_CHANNEL = "chanakya_briefings"
+
+# Postgres rejects NOTIFY payloads above 8000 bytes, so we trim the entity list if we must.
+MAX_NOTIFY_BYTES = 7500
+
+
+def briefing_event(briefing) -> dict:
+    """
+    Compact "briefing created" payload. Deliberately no content/scout/scholar blobs:
+    dashboards only need enough to update counters and know what to refetch.
+    """
+    return {
+        "type": "briefing_created",
+        "id": briefing.id,
+        "topic": briefing.topic,
+        "created_at": briefing.created_at.isoformat(),
+        "locations": [loc.name for loc in briefing.locations],
+        # Entity deltas: each of these just gained ONE mention
+        "entities": [{"id": e.id, "name": e.name, "type": e.type} for e in briefing.entities],
+    }
+
+
+class Subscriber:
+    """
+    One connected dashboard. The queue is BOUNDED: a slow client can never make the server
+    buffer unlimited events. If it falls behind we drop its backlog and tell it to resync once.
+    """
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # BACKPRESSURE: the client is too slow. Throw away what it hasn't read and
+            # send a single "resync", which costs it one /api/reports fetch instead of N events.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class LiveFeedBroker:
+    """
+    In-process pub/sub for briefing events.
+    publish() is safe to call from ANY thread (graph nodes run in the scheduler's thread too);
+    the actual fan-out always happens on the event loop that owns the subscriber queues.
+    """
+    def __init__(self, backend: str = LIVE_FEED_BACKEND, history_size: int = 200, queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.history = deque(maxlen=history_size)   # Ring buffer used for resume-from-last-id
+        # Highest id we can NOT replay: it fell out of the ring buffer, or was saved before this process started
+        self.replay_floor = 0
+        self.subscribers = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    # ---------- lifecycle ----------
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        if self.backend == "postgres":
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen_forever, name="live-feed-listener", daemon=True)
+            self._listener.start()
+        logger.info(f"📡 Live feed started ({self.backend} backend).")
+
+    def set_replay_floor(self, latest_id: int):
+        """
+        Called on the event loop after start() with the newest briefing id already in the database.
+        The ring buffer starts empty, so a client resuming from below that id gets a "resync".
+        """
+        self.replay_floor = max(self.replay_floor, latest_id)
+
+    def shutdown(self):
+        self._stop.set()
+        self._loop = None
+
+    # ---------- publishing ----------
+    def publish(self, event: dict):
+        if self.backend == "postgres":
+            self._notify(event)
+        else:
+            self.dispatch(event)
+
+    def dispatch(self, event: dict):
+        """Hands an event to the event loop. Thread-safe."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._fanout, event)
+
+    def _fanout(self, event: dict):
+        # Runs on the event loop thread, so no locks are needed around history/subscribers.
+        if len(self.history) == self.history.maxlen:
+            self.replay_floor = max(self.replay_floor, self.history[0]["id"])
+        self.history.append(event)
+        for sub in list(self.subscribers):
+            sub.offer(event)
+
+    def _notify(self, event: dict):
+        from sqlalchemy import text
+        from app.databases.db_config import engine
+
+        payload = json.dumps(event)
+        if len(payload.encode()) > MAX_NOTIFY_BYTES:
+            event = {**event, "entities": [], "truncated": True}
+            payload = json.dumps(event)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+                conn.commit()
+        except Exception as e:
+            logger.error(f"❌ LIVE FEED NOTIFY FAILED | Error: {str(e)}")
+
+    def _listen_forever(self):
+        """
+        Dedicated LISTEN connection (outside the SQLAlchemy pool, it lives for the whole process).
+        Every worker runs one of these, so a briefing written by ANY worker reaches every dashboard.
+        """
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(to_libpq_url(DATABASE_URL))
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+                while not self._stop.is_set():
+                    # Wake up every few seconds to check the stop flag; no busy-waiting.
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        self.dispatch(json.loads(note.payload))
+            except Exception as e:
+                logger.error(f"❌ LIVE FEED LISTENER ERROR, reconnecting | Error: {str(e)}")
+                time.sleep(2)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    # ---------- subscribing ----------
+    def subscribe(self, last_id: Optional[int] = None) -> Subscriber:
+        """
+        Must be called on the event loop. If last_id is given, everything newer is replayed first.
+        If the client missed events we can't replay (ring buffer overflow, or saved before a restart),
+        or knows ids we never saw, it gets a single "resync" instead.
+        """
+        sub = Subscriber(self.queue_size)
+        if last_id is not None:
+            newest = self.history[-1]["id"] if self.history else self.replay_floor
+            if last_id < self.replay_floor or last_id > newest:
+                sub.offer({"type": "resync"})
+            else:
+                for event in self.history:
+                    if event["id"] > last_id:
+                        sub.offer(event)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+
+
+# Singleton shared by the graph (publisher) and the API (subscribers)
+live_feed = LiveFeedBroker()
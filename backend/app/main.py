@@ -1,16 +1,26 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, Response
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from typing import List
-from contextlib import asynccontextmanager
+from typing import List, Optional
+from datetime import datetime
+from contextlib import asynccontextmanager, AsyncExitStack
+import asyncio
+import json
+import time
 from langchain_core.messages import HumanMessage, AIMessage
-from app.databases.db_config import engine, SessionLocal
+from app.databases.db_config import engine, SessionLocal, AsyncSessionLocal, async_engine, export_engine, ExportSessionLocal, pool_status
 from app.databases import models
-from app.databases.crud import CRUD
-from app.databases.db_config import SessionLocal
-from sqlalchemy import func
-from app.databases.models import Entity, BriefingEntities
+from app.databases.crud import CRUD, AsyncCRUD, BUCKET_STEPS
+from app.databases.entity_index import entity_index
+from app.databases.cooccurrence import cooccurrence_graph
+from app.databases.retention import (
+    ensure_payload_partitions, migrate_inline_payloads, migrate_location_geocode_columns, migrate_briefing_dedup_columns,
+    migrate_briefing_run_id_column, merge_duplicate_entities, backfill_mention_buckets,
+)
+from app.databases.export import ndjson_chunks, export_slots, EXPORT_BATCH_SIZE, EXPORT_COMPRESSIONS
 
 # CRITICAL: Load config from project root before importing agents
 load_dotenv("../.env")
@@ -19,15 +29,36 @@ from app.graph import app as chanakya_brain
 from app.scheduler import autopilot
 from app.agents.strategist import StrategistAgent
 from app.agents.chat_summarizer import ChatSummarizer
+from app.live_feed import live_feed
+from app.fingerprint import near_duplicates
+from app.forecast_cache import forecast_cache, forecast_key
+from app.admission import chat_admission, Overloaded
+from app.checkpointing import new_run_config, run_id, invoke_run, resume_run, describe_run, list_runs
+from app.batching import BatchMemo, run_batch, CHAT_BATCH_MAX_QUERIES, CHAT_BATCH_MAX_CONCURRENCY
+from app.telemetry import configure_logging, http_request_duration, metrics_payload
+
+configure_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # This runs right as the server boots up
+    live_feed.start(asyncio.get_running_loop())
+    # Warm the entity alias index so the first briefings already resolve names from memory
+    # ...and load the co-occurrence matrix for the related-entities endpoint
+    with SessionLocal() as db:
+        # Read AFTER start(): a briefing saved in between is then both replayable and below the floor (resync, never a gap)
+        live_feed.set_replay_floor(CRUD(db).latest_briefing_id())
+        entity_index.warm(db)
+        cooccurrence_graph.warm(db)
+        near_duplicates.warm(db)
     autopilot.start()
     yield # The server runs and handles requests
     # This runs right as the server is shutting down
     autopilot.shutdown()
+    live_feed.shutdown()
+    await async_engine.dispose()
+    await export_engine.dispose()
 
 
 app = FastAPI(
@@ -41,6 +72,13 @@ strategist = StrategistAgent()
 chat_summarizer = ChatSummarizer()
 chat_session = {}
 models.Base.metadata.create_all(bind=engine)
+migrate_location_geocode_columns(engine)
+migrate_briefing_dedup_columns(engine)
+migrate_briefing_run_id_column(engine)
+ensure_payload_partitions(engine)
+migrate_inline_payloads(engine)
+merge_duplicate_entities(engine)
+backfill_mention_buckets(engine)
 
 # Enable CORS (Cross-Origin Resource Sharing)
 # This allows our Frontend to talk to this Backend.
@@ -53,6 +91,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """
+    Latency per route TEMPLATE (/api/reports/{briefing_id}/raw, not one series per id).
+    Streaming routes are timed until their headers go out, not for the life of the stream.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_duration.record(time.perf_counter() - start, {
+            "route": route.path if route is not None else "unmatched",
+            "method": request.method,
+            "status": status,
+        })
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus scrape endpoint: node/agent/HTTP latency histograms, LLM tokens, cache hits, errors.
+    """
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
 
 @app.get("/")
 async def root():
@@ -74,19 +140,42 @@ class ChatRequest(BaseModel):
     query:str
     session_id:str="default"
 
+class ChatBatchRequest(BaseModel):
+    queries: List[str]
+    max_concurrency: Optional[int] = None   # Defaults to (and is capped at) CHAT_BATCH_MAX_CONCURRENCY
+
 class ForecastRequest(BaseModel):
     context: str
+    briefing_id: Optional[int] = None   # Links the cached forecast to its briefing
+    mode: str = "parallel"              # "parallel" = three concurrent scenario calls, "single" = one big call
 
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
+    """
+    Admission-controlled: requests of one session run strictly in order (so they can't race on
+    the shared history), and only a bounded number of pipelines run or wait at once.
+    Beyond that the client gets an immediate 429/503 with Retry-After.
+    """
+    try:
+        async with chat_admission.admit(request.session_id):
+            return await run_chat(request)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Chanakya is at capacity ({e.reason}). Retry in {e.retry_after}s.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+async def run_chat(request: ChatRequest):
     # Convert frontend generic messages {"role": "...", "text": "..."} 
     # into LangChain specific message objects
-    history = chat_session.get(request.session_id,[])
+    history = list(chat_session.get(request.session_id,[]))
     history.append(
         {"role": "user", "text": request.query}
     )
     if(len(history)>6):
-        summary = chat_summarizer.summarize(history)
+        # The LLM pipeline is blocking, so it runs on a worker thread and never stalls the event loop
+        summary = await asyncio.to_thread(chat_summarizer.summarize, history)
         history = history[-6:]
         history.insert(0, {"role": "chanakya", "text": summary["summary"]})
     langchain_messages = []
@@ -99,23 +188,95 @@ async def chat(request: ChatRequest):
     msgDic = {
         "messages": langchain_messages
     }
-    response = chanakya_brain.invoke(msgDic)
+    config = new_run_config("chat", request.session_id)
+    try:
+        response = await asyncio.to_thread(invoke_run, chanakya_brain, msgDic, config)
+    except Exception as e:
+        # The run is checkpointed up to the failed node: POST /api/runs/{run_id}/resume picks it up from there
+        raise HTTPException(status_code=502, detail={"error": str(e), "run_id": run_id(config)})
     history.append(
         {"role": "chanakya", "text": response["messages"][-1].content}
     )
     chat_session[request.session_id] = history
     response["messages"] = history
+    response["run_id"] = run_id(config)
 
     return response
 
+@app.post("/api/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    """
+    Many independent, history-free queries through the graph's batch execution.
+    NDJSON stream: one line per query AS SOON AS it finishes (match them up by "index"),
+    then a summary line with the work the batch shared (classifications, searches, embeddings).
+    Shares the /api/chat admission limits: one slot per pipeline it may run at once.
+    """
+    queries = [q for q in request.queries if q.strip()]
+    if not queries:
+        raise HTTPException(status_code=400, detail="queries must contain at least one non-empty query")
+    if len(queries) > CHAT_BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {CHAT_BATCH_MAX_QUERIES} queries per batch")
+    concurrency = max(1, min(request.max_concurrency or CHAT_BATCH_MAX_CONCURRENCY, CHAT_BATCH_MAX_CONCURRENCY,
+                             chat_admission.max_concurrent))
+
+    # The batch runs up to `concurrency` pipelines at once, so it holds that many /api/chat admission slots
+    # for as long as it streams. Admitted HERE, so an overloaded server still answers 429/503 + Retry-After.
+    admission = AsyncExitStack()
+    distinct = len({q.strip() for q in queries})
+    try:
+        await admission.enter_async_context(
+            chat_admission.admit(None, slots=concurrency, rounds=-(-distinct // concurrency))
+        )
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Chanakya is at capacity ({e.reason}). Retry in {e.retry_after}s.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    loop = asyncio.get_running_loop()
+
+    def result_lines():
+        # A plain generator: Starlette pulls each line on a worker thread, so the blocking graph never touches the event loop
+        try:
+            yield from batch_lines()
+        finally:
+            # Runs on the worker thread; the slots belong to the event loop (closing twice is a no-op)
+            asyncio.run_coroutine_threadsafe(admission.aclose(), loop)
+
+    def batch_lines():
+        memo = BatchMemo(queries)
+        start = time.perf_counter()
+        succeeded = failed = 0
+        for result in run_batch(chanakya_brain, queries, kind="batch", max_concurrency=concurrency, memo=memo):
+            if result["status"] == "error":
+                failed += 1
+            else:
+                succeeded += 1
+            yield json.dumps(result) + "\n"
+        yield json.dumps({
+            "done": True,
+            "queries": len(queries),
+            "succeeded": succeeded,
+            "failed": failed,
+            "max_concurrency": concurrency,
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+            "shared": memo.stats(),
+        }) + "\n"
+
+    # A client that disconnects before the first line never starts result_lines(): release the slots here too
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson", background=BackgroundTask(admission.aclose))
+
 @app.get("/api/reports")
-async def get_reports(limit: int = 10):
+async def get_reports(limit: int = 10, include_raw: bool = False):
     """
     Fetches the most recent intelligence briefings from the PostgreSQL database.
+    The raw scout/scholar intel lives in compressed cold storage and is only
+    loaded (one extra query for the whole page) when include_raw=true.
     """
-    with SessionLocal() as db:
-        crud = CRUD(db)
-        briefings = crud.get_recent_briefings(limit=limit)
+    async with AsyncSessionLocal() as db:
+        crud = AsyncCRUD(db)
+        briefings = await crud.get_recent_briefings(limit=limit)
+        payloads = await crud.get_briefing_payloads([b.id for b in briefings]) if include_raw else {}
         
         # We must manually format the SQLAlchemy objects into JSON-serializable dictionaries
         results = []
@@ -125,34 +286,73 @@ async def get_reports(limit: int = 10):
                 "topic": b.topic,
                 "content": b.content,
                 "created_at": b.created_at.isoformat(),
-                "scout_data": b.scout_data,
-                "scholar_data": b.scholar_data,
                 # Extract just the string names from the Location objects
-                "locations": [loc.name for loc in b.locations] 
+                "locations": [loc.name for loc in b.locations],
+                **payloads.get(b.id, {})
             })
             
         return {"reports": results}
 
+@app.get("/api/export/briefings")
+async def export_briefings(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    since_id: Optional[int] = None,
+    include_raw: bool = False,
+    compression: str = "none",
+):
+    """
+    The whole archive (or a created_at range, or everything after since_id) as NDJSON, oldest first.
+    Streamed from a server-side cursor on a separate small pool, so memory stays flat
+    and a long download never takes a connection away from the live API.
+    """
+    if compression not in EXPORT_COMPRESSIONS:
+        raise HTTPException(status_code=400, detail=f"compression must be one of {list(EXPORT_COMPRESSIONS)}")
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    release_slot = export_slots.try_acquire()
+    if release_slot is None:
+        raise HTTPException(status_code=503, detail="Too many exports running. Retry later.", headers={"Retry-After": "30"})
+
+    async def export_body():
+        try:
+            async with ExportSessionLocal() as db:
+                batches = AsyncCRUD(db).stream_briefing_export(
+                    start=start, end=end, since_id=since_id, include_raw=include_raw, batch_size=EXPORT_BATCH_SIZE
+                )
+                async for chunk in ndjson_chunks(batches, compression):
+                    yield chunk
+        finally:
+            release_slot()
+
+    filename = "briefings.ndjson" + (".zst" if compression == "zstd" else "")
+    return StreamingResponse(
+        export_body(),
+        media_type="application/zstd" if compression == "zstd" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        # A client that disconnects before the first chunk never starts export_body(), so its finally
+        # would not run; the background task releases the slot in that case (release is idempotent)
+        background=BackgroundTask(release_slot),
+    )
+
+@app.get("/api/reports/{briefing_id}/raw")
+async def get_report_raw(briefing_id: int):
+    """
+    On-demand, decompressed scout/scholar intel for ONE briefing (used when a report is opened).
+    """
+    async with AsyncSessionLocal() as db:
+        payloads = await AsyncCRUD(db).get_briefing_payloads([briefing_id])
+    return {"id": briefing_id, **payloads.get(briefing_id, {"scout_data": None, "scholar_data": None})}
+
 @app.get("/api/entities")
 async def get_entities():
     """
     Fetches extracted entities across all reports, grouped by type.
     """
 
-    with SessionLocal() as db:
+    async with AsyncSessionLocal() as db:
         # Get count of briefings per entity using a SQL JOIN
-        entities = (
-            db.query(
-                Entity.id, 
-                Entity.name, 
-                Entity.type,
-                func.count(BriefingEntities.briefing_id).label('mention_count')
-            )
-            .join(BriefingEntities, Entity.id == BriefingEntities.entity_id)
-            .group_by(Entity.id)
-            .order_by(func.count(BriefingEntities.briefing_id).desc())
-            .all()
-        )
+        entities = await AsyncCRUD(db).get_entity_mentions()
         
         results = {
             "people": [],
@@ -168,9 +368,309 @@ async def get_entities():
             
         return results
 
+@app.get("/api/entities/{entity_id}/related")
+async def get_related_entities(entity_id: int, k: int = Query(10, ge=1, le=100)):
+    """
+    Top-k entities that most often appear alongside this one, weighted so recent
+    co-occurrences count more (30 day half-life). Served from the in-memory CSR matrix,
+    only the k display names touch the database.
+    """
+    related = cooccurrence_graph.related(entity_id, k=k)
+    async with AsyncSessionLocal() as db:
+        names = await AsyncCRUD(db).get_subject_names("entity", {r["id"] for r in related} | {entity_id})
+    if entity_id not in names:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return {
+        "entity": {"id": entity_id, **names[entity_id]},
+        "related": [{**r, **names.get(r["id"], {})} for r in related]
+    }
+
+def _validate_rollup_params(subject_type: str, granularity: str):
+    if subject_type not in ("entity", "location"):
+        raise HTTPException(status_code=400, detail="subject_type must be 'entity' or 'location'")
+    if granularity not in BUCKET_STEPS:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {list(BUCKET_STEPS)}")
+
+@app.get("/api/timeline")
+async def get_timeline(
+    subject_type: str = "entity",
+    granularity: str = "day",
+    ids: Optional[List[int]] = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Returns mention counts per entity/location per hour, day or week.
+    Served from the pre-aggregated mention_buckets table, never from the raw briefings.
+    """
+    _validate_rollup_params(subject_type, granularity)
+    end = end or datetime.utcnow()
+    # Default range: the last 30 buckets of the requested size
+    start = start or end - BUCKET_STEPS[granularity] * 30
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    async with AsyncSessionLocal() as db:
+        crud = AsyncCRUD(db)
+        rows = await crud.get_timeline(subject_type, granularity, start, end, subject_ids=ids)
+        names = await crud.get_subject_names(subject_type, {r.subject_id for r in rows})
+
+        series = {}
+        for r in rows:
+            if r.subject_id not in series:
+                series[r.subject_id] = {"id": r.subject_id, **names.get(r.subject_id, {}), "points": []}
+            series[r.subject_id]["points"].append(
+                {"bucket": r.bucket_start.isoformat(), "mentions": r.mention_count}
+            )
+
+        return {
+            "subject_type": subject_type,
+            "granularity": granularity,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "series": list(series.values())
+        }
+
+@app.get("/api/timeline/movers")
+async def get_top_movers(
+    subject_type: str = "entity",
+    granularity: str = "day",
+    window: int = Query(7, ge=1, le=366),
+    k: int = Query(10, ge=1, le=100),
+):
+    """
+    Top-K entities/locations whose mentions grew the most in the last `window` buckets
+    compared to the `window` buckets before that.
+    """
+    _validate_rollup_params(subject_type, granularity)
+    async with AsyncSessionLocal() as db:
+        crud = AsyncCRUD(db)
+        rows = await crud.get_top_movers(subject_type, granularity, window=window, k=k)
+        names = await crud.get_subject_names(subject_type, {r.subject_id for r in rows})
+        return {
+            "subject_type": subject_type,
+            "granularity": granularity,
+            "window": window,
+            "movers": [
+                {
+                    "id": r.subject_id,
+                    **names.get(r.subject_id, {}),
+                    "current": int(r.current or 0),
+                    "previous": int(r.previous or 0),
+                    "delta": int(r.delta or 0),
+                }
+                for r in rows
+            ]
+        }
+
+@app.get("/api/map")
+def get_map(
+    briefing_ids: Optional[List[int]] = Query(None),
+    names: Optional[List[str]] = Query(None),
+    bbox: Optional[str] = None,
+):
+    """
+    Returns ready-to-plot map markers from the geocode cache on the Location table.
+    bbox uses Leaflet's toBBoxString() format: "min_lon,min_lat,max_lon,max_lat".
+    Served from the cache ONLY: names not geocoded yet come back in "pending" and the scheduler's
+    backfill is nudged to resolve them (Nominatim allows 1 lookup/s, far too slow for a request).
+    NOTE: This is a plain 'def' on purpose: the ORM session is sync, and FastAPI runs sync routes in a threadpool.
+    """
+    box = None
+    if bbox:
+        try:
+            box = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            box = ()
+        if len(box) != 4:
+            raise HTTPException(status_code=400, detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+
+    if not briefing_ids and not names:
+        raise HTTPException(status_code=400, detail="Provide briefing_ids or names")
+
+    with SessionLocal() as db:
+        crud = CRUD(db)
+        # e.g. locations of a briefing saved seconds ago: the dashboard refetches once the backfill has them
+        pending = crud.get_pending_location_names(briefing_ids=briefing_ids, names=names)
+        markers = crud.get_map_markers(briefing_ids=briefing_ids, names=names, bbox=box)
+    if pending:
+        autopilot.request_geocode_backfill()
+    return {"markers": markers, "pending": pending}
+
+# ==========================================
+# Live Feed: push instead of 15-second polling
+# ==========================================
+FEED_HEARTBEAT_SECONDS = 15
+
+def _parse_last_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+@app.get("/api/feed/stream")
+async def feed_stream(request: Request, last_id: Optional[int] = None):
+    """
+    Server-Sent Events stream of "briefing created" events.
+    Browsers' EventSource reconnects on its own and sends the Last-Event-ID header,
+    which we use to replay anything the dashboard missed while it was away.
+    An idle connection costs a heartbeat comment every 15s and ZERO database queries.
+    """
+    resume_from = last_id if last_id is not None else _parse_last_id(request.headers.get("last-event-id"))
+    subscriber = live_feed.subscribe(resume_from)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                event_id = f"id: {event['id']}\n" if "id" in event else ""
+                yield f"{event_id}event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            live_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Stop proxies (nginx) from buffering the stream into big delayed chunks
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/api/feed/ws")
+async def feed_websocket(websocket: WebSocket, last_id: Optional[int] = None):
+    """
+    WebSocket flavour of the same feed, for clients that prefer it over SSE.
+    """
+    await websocket.accept()
+    subscriber = live_feed.subscribe(last_id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.get(), timeout=FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                event = {"type": "heartbeat"}
+            await websocket.send_json(event)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        live_feed.unsubscribe(subscriber)
+
+@app.get("/api/chat/admission")
+async def get_chat_admission():
+    """
+    Live view of the chat admission queue (running, waiting, rejected, current Retry-After).
+    """
+    return chat_admission.stats()
+
+@app.get("/api/runs")
+async def get_runs(limit: int = Query(50, ge=1, le=500)):
+    """
+    Graph runs held by the checkpointer: failed runs awaiting resume (and every run with CHECKPOINT_KEEP_SUCCESSFUL).
+    """
+    return await asyncio.to_thread(list_runs, chanakya_brain, limit)
+
+@app.get("/api/runs/{run_id}")
+async def get_run(run_id: str, history: int = Query(20, ge=0, le=200)):
+    """
+    Intermediate state of one run: the node it stopped at, its error, the state values and the checkpoint trail.
+    """
+    described = await asyncio.to_thread(describe_run, chanakya_brain, run_id, history)
+    if described is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return described
+
+@app.post("/api/runs/{run_id}/resume")
+async def resume_graph_run(run_id: str):
+    """
+    Re-runs ONLY the failed stage of a checkpointed run; everything before it is reused.
+    """
+    if await asyncio.to_thread(describe_run, chanakya_brain, run_id, 0) is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    try:
+        response = await asyncio.to_thread(resume_run, chanakya_brain, run_id)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail={"error": str(e), "run_id": run_id})
+    messages = response.get("messages", [])
+    return {"run_id": run_id, "final_topic": response.get("final_topic"),
+            "answer": messages[-1].content if messages else None}
+
+@app.get("/api/db/pool")
+async def get_pool_status():
+    """
+    Connection pool occupancy and checkout wait-time metrics (sync + async engines).
+    """
+    return pool_status()
+
 @app.post('/api/forecast')
 async def forecast(request:ForecastRequest):
-    return strategist.analyze(request.context)
+    """
+    Cached by a hash of the context: the second click on the same briefing costs zero LLM calls.
+    """
+    if request.mode not in ("parallel", "single"):
+        raise HTTPException(status_code=400, detail="mode must be 'parallel' or 'single'")
+    generate = strategist.aanalyze_parallel if request.mode == "parallel" else strategist.aanalyze
+    result, cached = await forecast_cache.get_or_compute(
+        forecast_key(request.context, strategist.model_name, request.mode),
+        lambda: generate(request.context),
+        briefing_id=request.briefing_id,
+    )
+    return {**result, "cached": cached}
+
+@app.post('/api/forecast/stream')
+async def forecast_stream(request:ForecastRequest):
+    """
+    NDJSON stream, one {"scenario": ..., "text": ...} line per scenario AS SOON AS it finishes,
+    so the dashboard can show the first card while the other two are still generating.
+    If the generation fails, the last line is {"error": ...}.
+    Always the parallel scenario calls, so it shares cache entries and in-flight generations
+    with POST /api/forecast in "parallel" mode; a request that joins someone else's generation
+    gets all three lines when it finishes.
+    """
+    key = forecast_key(request.context, strategist.model_name, "parallel")
+
+    async def scenario_lines():
+        finished = asyncio.Queue()
+
+        async def generate():
+            result = {}
+            async for name, text in strategist.stream_scenarios(request.context):
+                result[name] = text
+                finished.put_nowait((name, text))
+            return result
+
+        lookup = asyncio.ensure_future(
+            forecast_cache.get_or_compute(key, generate, briefing_id=request.briefing_id)
+        )
+        lookup.add_done_callback(lambda _: finished.put_nowait(None))
+        try:
+            streamed = set()
+            while (item := await finished.get()) is not None:
+                name, text = item
+                streamed.add(name)
+                yield json.dumps({"scenario": name, "text": text, "cached": False}) + "\n"
+            try:
+                result, cached = lookup.result()
+            except Exception as e:
+                # The 200 and maybe some scenarios are already sent: report the failure in-band as the last line
+                yield json.dumps({"error": str(e)}) + "\n"
+                return
+            for name, text in result.items():
+                if name not in streamed:
+                    yield json.dumps({"scenario": name, "text": text, "cached": cached}) + "\n"
+        finally:
+            # The client went away: stop waiting, the shared generation itself keeps going
+            lookup.cancel()
+
+    return StreamingResponse(scenario_lines(), media_type="application/x-ndjson")
+
+@app.get('/api/forecast/cache')
+async def get_forecast_cache_stats():
+    return forecast_cache.stats()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,66 @@
+from typing import Callable, Dict
+
+from app.telemetry import token_usage
+
+# =========================================================
+# Backend Providers
+# Every agent gets its LLM, embeddings and web search from here instead of
+# constructing ChatGroq / HuggingFaceEmbeddings / DDGS itself.
+# The defaults are the production backends. The benchmark suite (backend/benchmarks)
+# registers fakes BEFORE importing app.graph, so the whole pipeline runs offline.
+# =========================================================
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+
+def _groq_llm(agent: str):
+    from langchain_groq import ChatGroq
+    return ChatGroq(model_name=DEFAULT_MODEL, callbacks=token_usage(agent))
+
+def _huggingface_embeddings():
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    # Free local embeddings (runs on the CPU/GPU, no API key)
+    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+
+def _duckduckgo_search():
+    from ddgs import DDGS
+    return DDGS()
+
+
+_factories: Dict[str, Callable] = {
+    "llm": _groq_llm,
+    "embeddings": _huggingface_embeddings,
+    "search": _duckduckgo_search,
+}
+# True when the embeddings' embed_query(text) == embed_documents([text])[0], so queries may be
+# embedded through one batched embed_documents() call. all-MiniLM-L6-v2 has no query instruction.
+_symmetric_embeddings = True
+
+
+def register(kind: str, factory: Callable, symmetric_embeddings: bool = False):
+    """
+    Swaps a backend for every agent created AFTERWARDS.
+    "llm" factories take the agent name; "embeddings" and "search" take nothing.
+    For "embeddings", pass symmetric_embeddings=True only if queries and documents are encoded
+    the same way (no query instruction/prefix); otherwise queries are embedded one by one.
+    """
+    global _symmetric_embeddings
+    if kind not in _factories:
+        raise ValueError(f"Unknown provider kind: {kind}")
+    _factories[kind] = factory
+    if kind == "embeddings":
+        _symmetric_embeddings = symmetric_embeddings
+
+
+def make_llm(agent: str):
+    """A chat model for `agent`; the name labels its token-usage metrics."""
+    return _factories["llm"](agent)
+
+def make_embeddings():
+    return _factories["embeddings"]()
+
+def embeddings_are_symmetric() -> bool:
+    return _symmetric_embeddings
+
+def make_search():
+    """Anything with a DDGS-style .text(query, max_results=...) method."""
+    return _factories["search"]()
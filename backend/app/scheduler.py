@@ -1,11 +1,25 @@
 from langchain_core.messages.human import HumanMessage
+import os
 import logging
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from app.graph import app as chanakya_brain
+from app.agents.geocoder import GeocoderAgent
+from app.databases.crud import CRUD
+from app.databases.db_config import SessionLocal, engine
+from app.databases.cooccurrence import cooccurrence_graph
+from app.databases.retention import ensure_payload_partitions, archive_old_payloads
+from app.telemetry import traced_call, record_error
+from app.checkpointing import new_run_config, invoke_run, prune_runs, AUTOPILOT_RESUME_RETRIES
+from app.batching import run_batch
 
 logger = logging.getLogger(__name__)
 
+# "staggered" = one job per standing order, 45s apart; "batch" = one job runs them all through graph batch execution
+AUTOPILOT_MODE = os.getenv("AUTOPILOT_MODE", "staggered")
+AUTOPILOT_BATCH_CONCURRENCY = int(os.getenv("AUTOPILOT_BATCH_CONCURRENCY", "2"))
+
 class IntelligenceScheduler:
     def __init__(self):
         # We use BackgroundScheduler so it doesn't block FastAPI's main thread
@@ -16,8 +30,12 @@ class IntelligenceScheduler:
             "Analyze current technological partnerships and semiconductor initiatives in India.",
             "Summarize recent diplomatic engagements between India and the Middle East or Indian Ocean region."
         ]
+        # The ONLY caller of the geocoder: /api/map serves the cache and leaves misses to backfill_geocodes
+        self.geocoder = GeocoderAgent()
 
-    def execute_standing_orders(self,order_text:str):
+    @traced_call("scheduler", "standing_order")
+    def execute_standing_orders(self,order_text:str) -> bool:
+        """Returns whether the run succeeded; failures are logged and recorded, never raised."""
         logger.info(f"🦾 AUTOPILOT ENGAGED: Executing Standing Order: {order_text}")
 
         try:
@@ -27,11 +45,87 @@ class IntelligenceScheduler:
                 ]
             }
 
-            chanakya_brain.invoke(msgDic)
+            # A failed stage is retried from its checkpoint, not from the top of the graph
+            invoke_run(chanakya_brain, msgDic, new_run_config("autopilot"), resume_retries=AUTOPILOT_RESUME_RETRIES)
             logger.info(f"✅ AUTOPILOT SUCCESS: {order_text}")
+            return True
         except Exception as e:
+            record_error("scheduler", e)
             logger.error(f"❌ AUTOPILOT FAILED: {order_text} | Error: {str(e)}")
-        
+            return False
+
+    @traced_call("scheduler", "standing_orders_batch")
+    def execute_standing_orders_batch(self):
+        """
+        All standing orders in one graph batch: at most AUTOPILOT_BATCH_CONCURRENCY at a time,
+        sharing searches/classifications/embeddings, each logged as soon as it finishes.
+        """
+        logger.info(f"🦾 AUTOPILOT ENGAGED: Executing {len(self.standing_orders)} Standing Orders as a batch")
+        try:
+            for result in run_batch(chanakya_brain, self.standing_orders, kind="autopilot",
+                                    max_concurrency=AUTOPILOT_BATCH_CONCURRENCY, resume_retries=AUTOPILOT_RESUME_RETRIES):
+                if result["status"] == "error":
+                    record_error("scheduler", result["error_type"])
+                    logger.error(f"❌ AUTOPILOT FAILED: {result['query']} | Run: {result['run_id']} | Error: {result['error']}")
+                else:
+                    logger.info(f"✅ AUTOPILOT SUCCESS: {result['query']}")
+        except Exception as e:
+            record_error("scheduler", e)
+            logger.error(f"❌ AUTOPILOT BATCH FAILED | Error: {str(e)}")
+
+    def backfill_geocodes(self):
+        """
+        Geocodes any Location rows that have never been looked up, a small batch at a time,
+        so the map endpoint almost always finds coordinates already cached.
+        """
+        try:
+            with SessionLocal() as db:
+                count = CRUD(db).geocode_pending_locations(self.geocoder, limit=25)
+            if count:
+                logger.info(f"🛰️ GEOCODER: Cached coordinates for {count} locations")
+        except Exception as e:
+            logger.error(f"❌ GEOCODER BACKFILL FAILED | Error: {str(e)}")
+
+    def request_geocode_backfill(self):
+        """
+        Runs the geocode backfill job right away instead of at its next minute tick.
+        Called by /api/map when it had to answer with pending locations.
+        """
+        job = self.scheduler.get_job("geocode_backfill") if self.scheduler.running else None
+        if job is not None:
+            job.modify(next_run_time=datetime.now())
+
+    def maintain_payload_storage(self):
+        """
+        Daily housekeeping for cold storage: pre-create next months' partitions, archive expired ones.
+        """
+        try:
+            ensure_payload_partitions(engine)
+            archive_old_payloads(engine)
+        except Exception as e:
+            logger.error(f"❌ PAYLOAD RETENTION FAILED | Error: {str(e)}")
+
+    def refresh_cooccurrence_graph(self):
+        """
+        Reloads the in-memory co-occurrence matrix, so pairs written by OTHER workers show up too.
+        """
+        try:
+            with SessionLocal() as db:
+                cooccurrence_graph.warm(db)
+        except Exception as e:
+            logger.error(f"❌ CO-OCCURRENCE REFRESH FAILED | Error: {str(e)}")
+
+    def prune_graph_checkpoints(self):
+        """
+        Drops checkpointed runs (failed ones, or all of them with CHECKPOINT_KEEP_SUCCESSFUL) past retention.
+        """
+        try:
+            pruned = prune_runs(chanakya_brain)
+            if pruned:
+                logger.info(f"🧹 CHECKPOINTS: Pruned {pruned} old graph runs")
+        except Exception as e:
+            logger.error(f"❌ CHECKPOINT PRUNE FAILED | Error: {str(e)}")
+
     def start(self):
         # Schedule the jobs. We will run them every 6 hours in production, 
         # but for testing, let's just run one every 1 minute.
@@ -39,21 +133,70 @@ class IntelligenceScheduler:
         # To run ALL orders, we just loop through the array and add a job for each one!
         # CRITICAL FIX: We must stagger the jobs so they don't fire at the exact same millisecond.
         # If we fire two LangGraphs concurrently, DuckDuckGo Search and ChromaDB will rate-limit or deadlock.
-        from datetime import datetime, timedelta
-        
-        for i, order in enumerate(self.standing_orders):
-            # We delay the first job by 10 seconds, the second by 55 seconds, etc.
-            staggered_start = datetime.now() + timedelta(seconds=10 + (i * 45))
-            
+        # In batch mode the concurrency is bounded by AUTOPILOT_BATCH_CONCURRENCY instead of by staggering.
+        if AUTOPILOT_MODE == "batch":
             self.scheduler.add_job(
-                self.execute_standing_orders,
+                self.execute_standing_orders_batch,
                 trigger="interval",
-                minutes=2, # Slowed down from 60 seconds to prevent API abuse
-                args=[order],
-                id=f"intel_update_{i}",
+                minutes=2,
+                id="intel_update_batch",
                 replace_existing=True,
-                next_run_time=staggered_start
+                max_instances=1,
+                next_run_time=datetime.now() + timedelta(seconds=10)
             )
+        else:
+            for i, order in enumerate(self.standing_orders):
+                # We delay the first job by 10 seconds, the second by 55 seconds, etc.
+                staggered_start = datetime.now() + timedelta(seconds=10 + (i * 45))
+                
+                self.scheduler.add_job(
+                    self.execute_standing_orders,
+                    trigger="interval",
+                    minutes=2, # Slowed down from 60 seconds to prevent API abuse
+                    args=[order],
+                    id=f"intel_update_{i}",
+                    replace_existing=True,
+                    next_run_time=staggered_start
+                )
+
+        # One job (never overlapping itself) keeps the geocode cache warm for new locations
+        self.scheduler.add_job(
+            self.backfill_geocodes,
+            trigger="interval",
+            minutes=1,
+            id="geocode_backfill",
+            replace_existing=True,
+            max_instances=1
+        )
+
+        self.scheduler.add_job(
+            self.maintain_payload_storage,
+            trigger="interval",
+            hours=24,
+            id="payload_retention",
+            replace_existing=True,
+            max_instances=1,
+            next_run_time=datetime.now() + timedelta(minutes=5)
+        )
+
+        self.scheduler.add_job(
+            self.refresh_cooccurrence_graph,
+            trigger="interval",
+            minutes=5,
+            id="cooccurrence_refresh",
+            replace_existing=True,
+            max_instances=1
+        )
+
+        self.scheduler.add_job(
+            self.prune_graph_checkpoints,
+            trigger="interval",
+            hours=6,
+            id="checkpoint_prune",
+            replace_existing=True,
+            max_instances=1,
+            next_run_time=datetime.now() + timedelta(minutes=10)
+        )
 
         # Start the background thread
         self.scheduler.start()
@@ -0,0 +1,265 @@
+import os
+import sys
+import json
+import time
+import logging
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Optional, Union
+
+from opentelemetry import trace, metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.trace import Status, StatusCode
+from langchain_core.callbacks import BaseCallbackHandler
+
+# =========================================================
+# Instrumentation for the graph, the agents and the API.
+# Metrics are ALWAYS on (an OTel histogram record is a couple of microseconds)
+# and are scraped from /metrics in Prometheus format.
+# Spans are only recorded and exported when an OTLP endpoint is configured;
+# otherwise the tracer is the no-op default and costs next to nothing.
+# =========================================================
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "chanakya-backend")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+# "json" = one JSON object per line (for log shippers), "text" = human readable
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Seconds. LLM calls live in the 0.2s - 10s range, DB and cache work well below that.
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# The graph node currently executing, so LLM token counts can be attributed to it
+current_node: ContextVar[Optional[str]] = ContextVar("current_node", default=None)
+
+logger = logging.getLogger(__name__)
+
+
+def _setup_metrics():
+    resource = Resource.create({"service.name": SERVICE_NAME})
+    readers = []
+    try:
+        from opentelemetry.exporter.prometheus import PrometheusMetricReader
+        readers.append(PrometheusMetricReader())
+    except ImportError:
+        logger.warning("⚠️ TELEMETRY: opentelemetry-exporter-prometheus not installed, /metrics will be empty")
+    provider = MeterProvider(resource=resource, metric_readers=readers)
+    metrics.set_meter_provider(provider)
+    return provider
+
+
+def _setup_tracing():
+    if not OTLP_ENDPOINT:
+        return
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    # Batching moves the export off the request path entirely
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=OTLP_ENDPOINT)))
+    trace.set_tracer_provider(provider)
+
+
+_setup_metrics()
+_setup_tracing()
+
+tracer = trace.get_tracer("chanakya")
+meter = metrics.get_meter("chanakya")
+
+node_duration = meter.create_histogram(
+    "chanakya_graph_node_duration", unit="s",
+    description="Wall time of one LangGraph node execution",
+    explicit_bucket_boundaries_advisory=LATENCY_BUCKETS,
+)
+agent_call_duration = meter.create_histogram(
+    "chanakya_agent_call_duration", unit="s",
+    description="Wall time of one agent call (LLM, search, vector store, geocoder)",
+    explicit_bucket_boundaries_advisory=LATENCY_BUCKETS,
+)
+http_request_duration = meter.create_histogram(
+    "chanakya_http_request_duration", unit="s",
+    description="Time until the API starts sending the response",
+    explicit_bucket_boundaries_advisory=LATENCY_BUCKETS,
+)
+llm_tokens = meter.create_counter(
+    "chanakya_llm_tokens", unit="{token}",
+    description="LLM tokens consumed, by agent, node and direction (prompt/completion)",
+)
+cache_requests = meter.create_counter(
+    "chanakya_cache_requests", unit="{request}",
+    description="Cache lookups, by cache and result (hit/miss)",
+)
+errors = meter.create_counter(
+    "chanakya_errors", unit="{error}",
+    description="Errors, by component and exception type",
+)
+
+
+# Optional raw-sample consumers (the benchmark suite computes exact percentiles from these).
+# Empty in production, so the hot path pays for a single truthiness check.
+_sample_listeners = []
+
+def add_sample_listener(listener):
+    """listener(span_name, seconds, status) is called after every traced node/agent call."""
+    _sample_listeners.append(listener)
+
+def remove_sample_listener(listener):
+    _sample_listeners.remove(listener)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.add(1, {"cache": cache, "result": "hit" if hit else "miss"})
+
+def record_error(component: str, exc: Union[BaseException, str]):
+    """`exc` is the exception, or just its class name when that is all that survived (batch results)."""
+    errors.add(1, {"component": component, "error": exc if isinstance(exc, str) else type(exc).__name__})
+
+
+def _instrument(func, span_name: str, histogram, attributes: dict, node: Optional[str] = None):
+    """
+    Wraps a sync or async function with a span, a latency histogram and an error counter.
+    Exceptions are recorded and re-raised untouched.
+    """
+    component = attributes.get("node") or attributes.get("agent")
+    # Attribute sets are built once per decorated function, not once per call
+    labels = {status: {**attributes, "status": status} for status in ("ok", "error")}
+
+    def _finish(start, status):
+        elapsed = time.perf_counter() - start
+        histogram.record(elapsed, labels[status])
+        if _sample_listeners:
+            for listener in _sample_listeners:
+                listener(span_name, elapsed, status)
+
+    def _fail(span, e):
+        record_error(component, e)
+        if span.is_recording():
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = current_node.set(node) if node else None
+            start = time.perf_counter()
+            with tracer.start_as_current_span(span_name, attributes=attributes) as span:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    _fail(span, e)
+                    _finish(start, "error")
+                    raise
+                finally:
+                    if token is not None:
+                        current_node.reset(token)
+            _finish(start, "ok")
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = current_node.set(node) if node else None
+        start = time.perf_counter()
+        with tracer.start_as_current_span(span_name, attributes=attributes) as span:
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _fail(span, e)
+                _finish(start, "error")
+                raise
+            finally:
+                if token is not None:
+                    current_node.reset(token)
+        _finish(start, "ok")
+        return result
+    return wrapper
+
+
+def traced_node(name: str):
+    """Decorator for LangGraph node functions."""
+    def decorator(func):
+        return _instrument(func, f"graph.node.{name}", node_duration, {"node": name}, node=name)
+    return decorator
+
+
+def traced_call(agent: str, operation: str):
+    """Decorator for agent methods (LLM calls, web search, vector search, geocoding)."""
+    def decorator(func):
+        return _instrument(func, f"agent.{agent}.{operation}", agent_call_duration,
+                           {"agent": agent, "operation": operation})
+    return decorator
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    LangChain callback that turns the provider's token usage into metrics.
+    Attached to each ChatGroq instance, so it fires for plain .invoke() and
+    .with_structured_output() alike, in the API and in the scheduler.
+    """
+    def __init__(self, agent: str):
+        self.agent = agent
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        if prompt is None and response.generations and response.generations[0]:
+            # Providers that only report usage on the message itself
+            meta = getattr(getattr(response.generations[0][0], "message", None), "usage_metadata", None) or {}
+            prompt, completion = meta.get("input_tokens"), meta.get("output_tokens")
+        attributes = {"agent": self.agent, "node": current_node.get() or "none"}
+        if prompt:
+            llm_tokens.add(prompt, {**attributes, "direction": "prompt"})
+        if completion:
+            llm_tokens.add(completion, {**attributes, "direction": "completion"})
+
+    def on_llm_error(self, error, **kwargs):
+        record_error(f"llm.{self.agent}", error)
+
+
+def token_usage(agent: str) -> list:
+    """`callbacks=` argument for a ChatGroq constructor."""
+    return [TokenUsageCallback(agent)]
+
+
+# =========================================================
+# Structured logging
+# =========================================================
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the active trace/span id so logs join up with traces."""
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        node = current_node.get()
+        if node:
+            payload["node"] = node
+        ctx = trace.get_current_span().get_span_context()
+        if ctx.is_valid:
+            payload["trace_id"] = format(ctx.trace_id, "032x")
+            payload["span_id"] = format(ctx.span_id, "016x")
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+
+def metrics_payload():
+    """(body, content_type) in the Prometheus text exposition format."""
+    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
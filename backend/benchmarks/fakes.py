@@ -0,0 +1,188 @@
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+
+class Latency:
+    """
+    A latency distribution in seconds, parsed from "kind:a,b":
+        fixed:0.2          always 200ms
+        uniform:0.1,0.5    anywhere between 100ms and 500ms
+        normal:0.4,0.1     mean 400ms, sd 100ms (clipped at 0)
+        lognormal:0.4,0.5  median 400ms, sigma 0.5 (long right tail, like real LLM APIs)
+    Seeded, so two runs with the same seed sleep for exactly the same durations.
+    """
+    def __init__(self, spec: str = "fixed:0", seed: int = 0):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                return self.params[0] if self.params else 0.0
+            if self.kind == "uniform":
+                return self._rng.uniform(self.params[0], self.params[1])
+            if self.kind == "normal":
+                return max(0.0, self._rng.gauss(self.params[0], self.params[1]))
+            # lognormal: params are (median, sigma); exp(mu) is the median
+            return self._rng.lognormvariate(math.log(self.params[0]), self.params[1])
+
+    def __repr__(self):
+        return f"Latency({self.spec!r})"
+
+
+class FakeBackendError(Exception):
+    """Injected failure, standing in for a provider 429/5xx."""
+
+
+def _stable_int(text: str) -> int:
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline stand-in for ChatGroq. Recognizes each agent by its system prompt and answers
+    in the shape that agent expects, deterministically for a given conversation.
+    Reports token usage exactly like Groq does, so the telemetry callback still counts tokens.
+    """
+    agent: str = "unknown"
+    latency: Any = None
+    error_rate: float = 0.0
+    seed: int = 0
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def with_structured_output(self, schema=None, *, method: str = "json_mode", **kwargs):
+        # The agents only use json_mode; parse the JSON text like langchain-groq does
+        return self | JsonOutputParser()
+
+    def _should_fail(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            if self._rng is None:
+                self._rng = random.Random(f"{self.seed}|{self.agent}")
+            return self._rng.random() < self.error_rate
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        system = " ".join(m.content for m in messages if isinstance(m, SystemMessage))
+        humans = [m.content for m in messages if isinstance(m, HumanMessage)]
+        last = humans[-1] if humans else ""
+        n = _stable_int(f"{self.seed}|{last}")
+
+        if "guardrail" in system:
+            return "ALLOWED"
+        if "routing system" in system:
+            return ("scout", "scholar", "both")[n % 3]
+        if "geospatial" in system:
+            places = ["New Delhi", "Ladakh", "Arunachal Pradesh", "Andaman Islands", "Gwadar", "Colombo"]
+            return json.dumps([places[n % len(places)], places[(n // 7) % len(places)]])
+        if "Chanakya, a Defense Intelligence AI" in system:
+            topic = f"Briefing {n % 10000}"
+            body = " ".join(f"Assessment point {i} on {last[:80]} (ref {n % 997}-{i})." for i in range(12))
+            return json.dumps({"topic": topic, "content": body})
+        if "elite intelligence analyst" in system:
+            people = ["Rajnath Singh", "S. Jaishankar", "Ajit Doval", "Anil Chauhan"]
+            orgs = ["DRDO", "Indian Navy", "HAL", "BEL", "ISRO"]
+            countries = ["India", "China", "Pakistan", "Sri Lanka", "United States"]
+            return json.dumps({
+                "people": [people[n % len(people)]],
+                "organizations": [orgs[n % len(orgs)], orgs[(n // 5) % len(orgs)]],
+                "countries": [countries[n % len(countries)], "India"],
+            })
+        if "Strategic Summary" in system:
+            return json.dumps({"summary": f"Summary of {len(messages) - 1} messages."})
+        if "write ONE scenario" in system:
+            return json.dumps({"scenario": f"Scenario for context {n % 1000}."})
+        if "Strategic Forecast" in system:
+            return json.dumps({"optimistic": "Best case.", "base_case": "Likely case.", "pessimistic": "Worst case."})
+        return "OK"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        text = self._respond(messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = max(1, len(text) // 4)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))],
+            llm_output={"token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }, "model_name": "fake"},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency.sample())
+        if self._should_fail():
+            raise FakeBackendError(f"Injected failure ({self.agent})")
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency.sample())
+        if self._should_fail():
+            raise FakeBackendError(f"Injected failure ({self.agent})")
+        return self._result(messages)
+
+
+class FakeSearch:
+    """Offline stand-in for DDGS: deterministic results after a sampled delay."""
+    def __init__(self, latency: Optional[Latency] = None, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(0)
+        self.calls = 0
+
+    def text(self, query: str, max_results: int = 5):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency.sample())
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeBackendError("Injected search failure")
+        n = _stable_int(query)
+        return [
+            {
+                "title": f"Report {n % 1000}-{i}: {query[:60]}",
+                "href": f"https://example.org/intel/{n % 1000}/{i}",
+                "body": f"Open-source reporting on {query[:120]}. Item {i} of {max_results}.",
+            }
+            for i in range(max_results)
+        ]
+
+
+class FakeEmbeddings(DeterministicFakeEmbedding):
+    """Hash-seeded vectors (same text -> same vector) with an optional per-call delay."""
+    latency: Any = None
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency.sample())
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        if self.latency:
+            time.sleep(self.latency.sample())
+        return super().embed_query(text)
@@ -0,0 +1,111 @@
+import os
+from typing import Dict, List
+
+# =========================================================
+# Fixture corpus for the ScholarAgent.
+# Small, synthetic "doctrine" documents written out as real PDFs, so ingestion
+# goes through the same PyPDFLoader -> splitter -> Chroma path as production.
+# =========================================================
+DOCUMENTS: Dict[str, List[str]] = {
+    "joint_doctrine_2017": [
+        "Joint Doctrine of the Armed Forces. The doctrine sets out the principles of joint planning, "
+        "integrated theatre commands and the conduct of operations across land, sea and air.",
+        "Credible deterrence rests on conventional capability, a survivable nuclear triad and a "
+        "declared policy of no first use. Escalation control is the responsibility of the political leadership.",
+        "Cyber, space and special operations are recognised as tri-service domains requiring "
+        "dedicated agencies and unified command and control.",
+    ],
+    "maritime_security_strategy": [
+        "Ensuring Secure Seas. The maritime security strategy identifies the Indian Ocean Region "
+        "as the primary area of interest, including the choke points of Malacca, Hormuz and Bab-el-Mandeb.",
+        "Sea lines of communication carry the bulk of national trade and energy imports. "
+        "Presence, surveillance and partnerships with littoral states underpin maritime domain awareness.",
+        "Coastal security is coordinated between the Navy, the Coast Guard and state marine police.",
+    ],
+    "defence_acquisition_procedure": [
+        "Defence Acquisition Procedure. Categorisation prioritises Buy (Indian-IDDM), then Buy (Indian), "
+        "then Buy and Make, with Buy (Global) permitted only by exception.",
+        "Indigenous content thresholds are specified per category. Offsets may be discharged through "
+        "technology transfer, investment in defence manufacturing or the purchase of eligible products.",
+        "Trials are conducted by the user service and the quality assurance agency before the "
+        "commercial negotiation committee concludes the contract.",
+    ],
+    "border_infrastructure_review": [
+        "Border Roads and Infrastructure. Road, bridge and tunnel projects along the northern borders "
+        "improve all-weather connectivity for forward areas in Ladakh, Sikkim and Arunachal Pradesh.",
+        "Advanced landing grounds and logistics nodes reduce induction times for reserves. "
+        "Vibrant village programmes support civilian habitation close to the line of actual control.",
+    ],
+}
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        lines.append(current)
+    return lines
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """
+    A minimal, valid PDF (one Helvetica text stream per page). Enough for pypdf to extract the text,
+    and it keeps the repo free of binary fixtures and of a PDF-writing dependency.
+    """
+    objects = []   # object bodies, numbered from 1
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")   # placeholder, filled in once the kids are known
+    page_ids = []
+    for text in pages:
+        lines = _wrap(text)
+        stream = "BT /F1 11 Tf 14 TL 50 780 Td " + " ".join(f"({_escape(l)}) Tj T*" for l in lines) + " ET"
+        content_id = add(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>".encode("latin-1")
+        ))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")
+    catalog_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("latin-1"))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def write_pdf_corpus(directory: str) -> List[str]:
+    """Writes one PDF per fixture document into `directory` and returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, pages in DOCUMENTS.items():
+        path = os.path.join(directory, f"{name}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(pages))
+        paths.append(path)
+    return paths
+
+
+def corpus_texts() -> List[str]:
+    return [page for pages in DOCUMENTS.values() for page in pages]
@@ -0,0 +1,399 @@
+"""
+Offline end-to-end load and latency benchmark for the Chanakya backend.
+
+Every external dependency is replaced by a deterministic stand-in (see benchmarks/fakes.py):
+Groq -> FakeChatModel, DuckDuckGo -> FakeSearch, HuggingFace -> FakeEmbeddings, and the
+ScholarAgent reads a generated fixture PDF corpus. The real FastAPI app is served by uvicorn
+on a local port and driven over HTTP at a fixed concurrency.
+
+    cd backend
+    python -m benchmarks.run --concurrency 8 --requests 40 --out bench.json
+    python -m benchmarks.run --concurrency 8 --requests 40 --baseline bench.json   # exit 1 on regression
+
+Use --database-url postgresql://... to benchmark against a local Postgres instead of SQLite.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+QUERIES = [
+    "What is the latest on India's border infrastructure in Ladakh?",
+    "Summarize recent Indian Navy deployments in the Indian Ocean.",
+    "How does the Defence Acquisition Procedure prioritise indigenous content?",
+    "Assess China's port investments in Sri Lanka and Pakistan.",
+    "What are the principles of joint theatre commands?",
+    "Give an update on HAL and DRDO fighter programmes.",
+    "Analyze maritime choke points relevant to India's energy imports.",
+    "What changed in India-US defence technology cooperation this year?",
+    "Brief me on coastal security coordination between Navy and Coast Guard.",
+    "What is India's nuclear doctrine on no first use?",
+    "Review recent tunnel and bridge projects in Arunachal Pradesh.",
+    "Summarize semiconductor partnerships relevant to defence manufacturing.",
+]
+
+PHASES = ("chat", "batch", "reports", "entities", "scheduler")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load and latency benchmark (no network, no API keys).")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests per phase")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per phase")
+    parser.add_argument("--phases", default=",".join(PHASES), help=f"Comma-separated subset of {PHASES}")
+    parser.add_argument("--llm-latency", default="lognormal:0.35,0.4", help="e.g. fixed:0.2, uniform:0.1,0.5, lognormal:0.35,0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency", default="lognormal:0.3,0.3")
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-latency", default="fixed:0.005")
+    parser.add_argument("--database-url", default=None, help="Defaults to a fresh SQLite file in a temp dir")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="Write the JSON report here (default: stdout only)")
+    parser.add_argument("--baseline", default=None, help="A previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="Fail if p95 grows or throughput drops by more than this fraction vs the baseline")
+    return parser.parse_args(argv)
+
+
+# =========================================================
+# Setup. Order matters: the environment and the fake providers must be
+# in place BEFORE app.* is imported, because agents are built at import time.
+# =========================================================
+
+def configure_environment(args, workdir: str) -> str:
+    url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+    os.environ["LIVE_FEED_BACKEND"] = "memory"
+    os.environ.setdefault("CHECKPOINT_SQLITE_PATH", os.path.join(workdir, "checkpoints.sqlite"))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # The batch phase sends all --requests in one call, at --concurrency
+    os.environ.setdefault("CHAT_BATCH_MAX_QUERIES", str(args.requests))
+    os.environ.setdefault("CHAT_BATCH_MAX_CONCURRENCY", str(args.concurrency))
+    return url
+
+
+def install_fakes(args):
+    from app import providers
+    from benchmarks.fakes import FakeChatModel, FakeSearch, FakeEmbeddings, Latency
+
+    llm_latency = Latency(args.llm_latency, seed=args.seed)
+    providers.register("llm", lambda agent: FakeChatModel(
+        agent=agent, latency=llm_latency, error_rate=args.llm_error_rate, seed=args.seed,
+    ))
+    search = FakeSearch(Latency(args.search_latency, seed=args.seed + 1), error_rate=args.search_error_rate)
+    providers.register("search", lambda: search)
+    embedding_latency = Latency(args.embedding_latency, seed=args.seed + 2)
+    # Hash-seeded by text, so a query embeds the same through either method
+    providers.register("embeddings", lambda: FakeEmbeddings(size=384, latency=embedding_latency),
+                       symmetric_embeddings=True)
+
+
+def build_scholar(workdir: str):
+    """Ingests the fixture PDFs into a throwaway Chroma store and plugs it into the graph."""
+    from app import graph
+    from app.agents.scholar import ScholarAgent
+    from benchmarks.fixtures import write_pdf_corpus, corpus_texts
+
+    corpus_dir = os.path.join(workdir, "corpus")
+    write_pdf_corpus(corpus_dir)
+    agent = ScholarAgent(persist_directory=os.path.join(workdir, "chroma"))
+    try:
+        agent.ingest_documents(corpus_dir)
+    except ImportError as e:
+        # PyPDFLoader needs pypdf; the same pages go straight into Chroma instead
+        print(f"⚠️ [BENCH] PDF ingestion unavailable ({e}), indexing fixture text directly.")
+        from langchain_chroma import Chroma
+        agent.vector_store = Chroma.from_texts(corpus_texts(), embedding=agent.embeddings,
+                                               persist_directory=agent.persist_directory)
+    graph.scholar = agent
+
+
+def warm_indexes():
+    # What the FastAPI lifespan does; the benchmark server runs with lifespan="off"
+    # so the real autopilot never fires in the middle of a measurement.
+    from app.databases.db_config import SessionLocal
+    from app.databases.entity_index import entity_index
+    from app.databases.cooccurrence import cooccurrence_graph
+    from app.fingerprint import near_duplicates
+
+    with SessionLocal() as db:
+        entity_index.warm(db)
+        cooccurrence_graph.warm(db)
+        near_duplicates.warm(db)
+
+
+def start_server(app):
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 15
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Benchmark server did not start")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+# =========================================================
+# Measurement
+# =========================================================
+
+class Recorder:
+    """Collects raw latency samples per endpoint and, via the telemetry hook, per graph node / agent call."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phase = None
+        self.endpoints = defaultdict(list)                      # phase -> [(seconds, ok)]
+        self.spans = defaultdict(lambda: defaultdict(list))     # phase -> span -> [(seconds, ok)]
+        self.wall = {}
+
+    def record_request(self, phase: str, seconds: float, ok: bool):
+        with self._lock:
+            self.endpoints[phase].append((seconds, ok))
+
+    def on_span(self, span_name: str, seconds: float, status: str):
+        phase = self.phase
+        if phase is None:
+            return
+        with self._lock:
+            self.spans[phase][span_name].append((seconds, status == "ok"))
+
+
+def summarize(samples, wall_seconds: float = None) -> dict:
+    if not samples:
+        return {"count": 0, "errors": 0}
+    latencies = np.array([s for s, _ in samples]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    stats = {
+        "count": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "mean_ms": round(float(latencies.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(latencies.max()), 2),
+    }
+    if wall_seconds:
+        stats["throughput_rps"] = round(len(samples) / wall_seconds, 3)
+    return stats
+
+
+async def drive_http(base_url: str, phase: str, build_request, total: int, concurrency: int, recorder: Recorder):
+    """Closed loop: `concurrency` workers each send their next request as soon as the previous one returns."""
+    import httpx
+
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        async def worker():
+            for i in counter:
+                method, path, body = build_request(i)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                recorder.record_request(phase, time.perf_counter() - start, ok)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+async def drive_batch(base_url: str, total: int, concurrency: int, recorder: Recorder):
+    """One /api/chat/batch call with `total` queries; each sample is the time until that query's line arrived."""
+    import httpx
+
+    body = {"queries": [QUERIES[i % len(QUERIES)] for i in range(total)], "max_concurrency": concurrency}
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        start = time.perf_counter()
+        async with client.stream("POST", "/api/chat/batch", json=body) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise RuntimeError(f"/api/chat/batch returned {response.status_code}: {response.text}")
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                if result.get("done"):
+                    print(f"   shared work: {result['shared']}")
+                    continue
+                recorder.record_request("batch", time.perf_counter() - start, result["status"] != "error")
+        return time.perf_counter() - start
+
+
+def drive_scheduler(total: int, concurrency: int, recorder: Recorder):
+    """Runs standing orders on a thread pool, the way APScheduler's executor does."""
+    from app.scheduler import autopilot
+
+    orders = autopilot.standing_orders + QUERIES
+
+    def one(i):
+        start = time.perf_counter()
+        # execute_standing_orders swallows exceptions but reports whether THIS run succeeded
+        ok = autopilot.execute_standing_orders(orders[i % len(orders)])
+        recorder.record_request("scheduler", time.perf_counter() - start, ok)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return time.perf_counter() - start
+
+
+REQUESTS = {
+    "chat": lambda concurrency: lambda i: ("POST", "/api/chat",
+                                          {"query": QUERIES[i % len(QUERIES)], "session_id": f"bench-{i % concurrency}"}),
+    "reports": lambda concurrency: lambda i: ("GET", "/api/reports?limit=20", None),
+    "entities": lambda concurrency: lambda i: ("GET", "/api/entities", None),
+}
+
+
+# =========================================================
+# Baseline comparison
+# =========================================================
+
+def compare(current: dict, baseline: dict, max_regression: float):
+    """Returns (rows, regressed). Compares p95 and throughput for every endpoint and every node/agent span."""
+    rows, regressed = [], False
+
+    def check(label, now, then):
+        nonlocal regressed
+        if not now.get("count") or not then.get("count"):
+            return
+        p95_delta = (now["p95_ms"] - then["p95_ms"]) / then["p95_ms"] if then["p95_ms"] else 0.0
+        row = {"name": label, "p95_ms": now["p95_ms"], "baseline_p95_ms": then["p95_ms"], "p95_change": round(p95_delta, 3)}
+        bad = p95_delta > max_regression
+        if "throughput_rps" in now and then.get("throughput_rps"):
+            rps_delta = (now["throughput_rps"] - then["throughput_rps"]) / then["throughput_rps"]
+            row.update(throughput_rps=now["throughput_rps"], baseline_throughput_rps=then["throughput_rps"],
+                       throughput_change=round(rps_delta, 3))
+            bad = bad or rps_delta < -max_regression
+        row["regressed"] = bad
+        regressed = regressed or bad
+        rows.append(row)
+
+    for name, stats in current["endpoints"].items():
+        check(f"endpoint:{name}", stats, baseline.get("endpoints", {}).get(name, {}))
+    for phase, spans in current["spans"].items():
+        for span, stats in spans.items():
+            check(f"{phase}:{span}", stats, baseline.get("spans", {}).get(phase, {}).get(span, {}))
+    return rows, regressed
+
+
+def print_report(report: dict, rows=None):
+    print(f"\n{'phase / span':<52}{'count':>7}{'err':>5}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, s in report["endpoints"].items():
+        print(f"{'endpoint:' + name:<52}{s['count']:>7}{s['errors']:>5}{s.get('throughput_rps', 0):>9}"
+              f"{s.get('p50_ms', 0):>10}{s.get('p95_ms', 0):>10}{s.get('p99_ms', 0):>10}")
+        for span, st in sorted(report["spans"].get(name, {}).items()):
+            print(f"{'  ' + span:<52}{st['count']:>7}{st['errors']:>5}{'':>9}"
+                  f"{st['p50_ms']:>10}{st['p95_ms']:>10}{st['p99_ms']:>10}")
+    if rows:
+        print("\nvs baseline (p95 change / throughput change):")
+        for r in rows:
+            flag = "  REGRESSED" if r["regressed"] else ""
+            print(f"  {r['name']:<50}{r['p95_change']:>+8.1%}{r.get('throughput_change', 0):>+8.1%}{flag}")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    phases = [p for p in args.phases.split(",") if p]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        raise SystemExit(f"Unknown phases: {sorted(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="chanakya-bench-")
+    database_url = configure_environment(args, workdir)
+    install_fakes(args)
+
+    from app.main import app
+    from app.telemetry import add_sample_listener
+    from app.databases.db_config import engine
+
+    build_scholar(workdir)
+    warm_indexes()
+    recorder = Recorder()
+    add_sample_listener(recorder.on_span)
+    server, thread, base_url = start_server(app)
+
+    try:
+        for phase in phases:
+            print(f"🏁 [BENCH] {phase}: {args.requests} requests at concurrency {args.concurrency}...")
+            recorder.phase = phase
+            if phase == "scheduler":
+                wall = drive_scheduler(args.requests, args.concurrency, recorder)
+            elif phase == "batch":
+                wall = asyncio.run(drive_batch(base_url, args.requests, args.concurrency, recorder))
+            else:
+                wall = asyncio.run(drive_http(base_url, phase, REQUESTS[phase](args.concurrency),
+                                              args.requests, args.concurrency, recorder))
+            recorder.wall[phase] = wall
+            recorder.phase = None
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "database_url": database_url if args.database_url is None else "(custom)",
+            "concurrency": args.concurrency,
+            "requests_per_phase": args.requests,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "search_latency": args.search_latency,
+            "search_error_rate": args.search_error_rate,
+            "embedding_latency": args.embedding_latency,
+            "seed": args.seed,
+        },
+        "endpoints": {phase: summarize(recorder.endpoints[phase], recorder.wall.get(phase)) for phase in phases},
+        "spans": {
+            phase: {span: summarize(samples) for span, samples in sorted(recorder.spans[phase].items())}
+            for phase in phases if recorder.spans.get(phase)
+        },
+    }
+
+    rows, regressed = None, False
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows, regressed = compare(report, json.load(f), args.max_regression)
+        report["comparison"] = {"baseline": args.baseline, "max_regression": args.max_regression,
+                                "regressed": regressed, "rows": rows}
+
+    print_report(report, rows)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 [BENCH] Report written to {args.out}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
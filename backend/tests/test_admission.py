@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, Overloaded, WeightedSlots
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold(controller, session_id, release, slots=1, rounds=1):
+    async with controller.admit(session_id, slots=slots, rounds=rounds):
+        await release.wait()
+
+
+async def settle():
+    # Let every task started so far run up to its next real wait (wait_for() adds a few loop turns)
+    await asyncio.sleep(0.01)
+
+
+def test_retry_after_maths():
+    controller = AdmissionController(max_concurrent=4, max_queue=8)
+    controller.avg_service_seconds = 10.0
+    assert controller.retry_after() == 3          # (0 + 1) / 4 * 10 = 2.5, rounded half up
+    controller.waiting = 7
+    assert controller.retry_after() == 20         # (7 + 1) / 4 * 10
+    controller.avg_service_seconds = 0.01
+    assert controller.retry_after() == 1          # Never tells a client to retry after 0s
+
+
+def test_queue_full_is_503_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, None, release)) for _ in range(2)]
+        await settle()
+        assert (controller.in_flight, controller.waiting) == (1, 1)
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.admit(None):
+                pass
+        release.set()
+        await asyncio.gather(*tasks)
+        return controller, rejected.value
+
+    controller, error = run(scenario())
+    assert (error.status_code, error.reason) == (503, "queue_full")
+    assert error.retry_after >= 1
+    assert (controller.in_flight, controller.waiting, controller.rejected) == (0, 0, 1)
+
+
+def test_busy_session_is_429_and_runs_in_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=4, max_queue=4, max_session_pending=2)
+        order, release = [], asyncio.Event()
+
+        async def request(n):
+            async with controller.admit("s1"):
+                order.append(n)
+                await release.wait()
+
+        tasks = [asyncio.create_task(request(n)) for n in range(2)]
+        await settle()
+        assert order == [0]                        # The second waits for its own session, not a slot
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.admit("s1"):
+                pass
+        release.set()
+        await asyncio.gather(*tasks)
+        return controller, order, rejected.value
+
+    controller, order, error = run(scenario())
+    assert (error.status_code, error.reason) == (429, "session_busy")
+    assert order == [0, 1]
+    assert controller.stats()["active_sessions"] == 0
+
+
+def test_queue_timeout_gives_back_its_place():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, None, release))
+        await settle()
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.admit(None):
+                pass
+        release.set()
+        await holder
+        return controller, rejected.value
+
+    controller, error = run(scenario())
+    assert (error.status_code, error.reason) == (503, "queue_timeout")
+    assert (controller.in_flight, controller.waiting, controller._slots.free) == (0, 0, 1)
+
+
+def test_batch_counts_slots_and_rounds():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=4, max_queue=0)
+        release = asyncio.Event()
+        batch = asyncio.create_task(hold(controller, None, release, slots=8, rounds=3))
+        await settle()
+        in_flight = controller.in_flight            # Capped at max_concurrent
+        with pytest.raises(Overloaded):
+            async with controller.admit(None):
+                pass
+        release.set()
+        await batch
+        return controller, in_flight
+
+    controller, in_flight = run(scenario())
+    assert in_flight == 4
+    assert controller.in_flight == 0
+    # A near-instant block spread over 3 rounds pulls the per-pipeline estimate down from 5s
+    assert controller.avg_service_seconds < 0.8 * 5.0 + 0.01
+
+
+def test_weighted_slots_are_first_come_first_served():
+    async def scenario():
+        slots, order = WeightedSlots(3), []
+
+        async def take(name, n):
+            await slots.acquire(n)
+            order.append(name)
+            slots.release(n)
+
+        await slots.acquire(2)
+        big = asyncio.create_task(take("big", 3))
+        await settle()
+        small = asyncio.create_task(take("small", 1))
+        await settle()
+        # One slot is free, but "small" must not jump ahead of "big"
+        assert order == []
+        slots.release(2)
+        await asyncio.gather(big, small)
+        return slots, order
+
+    slots, order = run(scenario())
+    assert order == ["big", "small"]
+    assert slots.free == 3
+
+
+def test_cancelled_waiter_unblocks_the_queue():
+    async def scenario():
+        slots = WeightedSlots(2)
+        await slots.acquire(1)
+        big = asyncio.create_task(slots.acquire(2))
+        await settle()
+        small = asyncio.create_task(slots.acquire(1))
+        await settle()
+        assert not small.done()                     # Queued behind "big"
+        big.cancel()
+        await settle()
+        assert small.done() and not small.cancelled()
+        return slots
+
+    slots = run(scenario())
+    assert slots.free == 0
+    assert not slots._waiters
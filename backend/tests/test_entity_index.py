@@ -0,0 +1,94 @@
+import pytest
+
+from app.databases.entity_index import (
+    EntityAliasIndex, normalize_entity_name, edit_distance, is_typo_variant,
+)
+
+
+@pytest.mark.parametrize("name, key", [
+    ("U.S.", "united states"),
+    ("USA", "united states"),
+    ("The Pentagon", "pentagon"),
+    ("Tata Advanced Systems Ltd.", "tata advanced systems"),
+    ("People's Liberation Army", "peoples liberation army"),
+    ("Türkiye", "turkiye"),
+    ("Su-30MKI", "su 30mki"),
+    ("  Russian   Federation ", "russia"),
+    ("Co", "co"),   # A lone suffix is the name itself, not something to strip
+])
+def test_normalize_entity_name(name, key):
+    assert normalize_entity_name(name) == key
+
+
+def test_edit_distance_stops_at_limit():
+    assert edit_distance("modi", "mody", 2) == 1
+    assert edit_distance("kitten", "sitting", 5) == 3
+    assert edit_distance("india", "indonesia", 2) == 3   # limit + 1, not the real distance
+    assert edit_distance("abc", "abcdefgh", 1) == 2
+
+
+@pytest.fixture
+def index():
+    index = EntityAliasIndex()
+    for entity_id, (name, entity_type) in enumerate([
+        ("Narendra Modi", "person"),
+        ("Shanghai Cooperation Organisation", "organization"),
+        ("People's Liberation Army", "organization"),
+        ("Central Military Commission", "organization"),
+        ("National Security Council", "organization"),
+        ("Indian Army", "organization"),
+        ("Su-30MKI", "equipment"),
+        ("Russia", "country"),
+        ("Iran", "country"),
+    ], start=1):
+        index.add(normalize_entity_name(name), entity_id, entity_type)
+    return index
+
+
+@pytest.mark.parametrize("name, entity_type, entity_id", [
+    ("Narendra Mody", "person", 1),
+    ("Shanghai Cooperation Organization", "organization", 2),
+    ("Peoples Liberaton Army", "organization", 3),
+])
+def test_fuzzy_lookup_matches_typos(index, name, entity_type, entity_id):
+    hit = index.fuzzy_lookup(normalize_entity_name(name), entity_type)
+    assert hit is not None and hit[0] == entity_id
+
+
+@pytest.mark.parametrize("name, entity_type", [
+    # Extra words name a different (sub-)organisation
+    ("People's Liberation Army Navy", "organization"),
+    ("Central Military Commission of China", "organization"),
+    ("National Security Council Secretariat", "organization"),
+    # Same shape, different thing
+    ("Indian Navy", "organization"),
+    ("Su-35MKI", "equipment"),
+    ("Prussia", "country"),
+    ("Iraq", "country"),
+    # Right spelling, wrong type
+    ("Narendra Mody", "organization"),
+])
+def test_fuzzy_lookup_rejects_false_merges(index, name, entity_type):
+    assert index.fuzzy_lookup(normalize_entity_name(name), entity_type) is None
+
+
+def test_is_typo_variant_rules():
+    assert is_typo_variant("narendra mody", "narendra modi")
+    assert not is_typo_variant("sco summit", "sco")                          # word count
+    assert not is_typo_variant("indian navy", "indian army")                 # 3 edits in 11 chars
+    assert not is_typo_variant("su 35 fighter jet", "su 30 fighter jet")     # numbers differ
+    assert not is_typo_variant("prussia", "russia")                          # too short for any edit
+
+
+def test_discard_entity_drops_every_key(index):
+    index.add("modi", 1, "person")
+    index.discard_entity(1)
+    assert index.lookup("modi") is None
+    assert index.lookup("narendra modi") is None
+    assert index.fuzzy_lookup("narendra mody", "person") is None
+    assert index.lookup("indian army") == 6
+
+
+def test_add_keeps_first_entity_for_a_key(index):
+    index.add("indian army", 99, "organization")
+    assert index.lookup("indian army") == 6
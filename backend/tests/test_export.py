@@ -0,0 +1,89 @@
+import asyncio
+
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from app.databases.export import ExportSlots, ndjson_chunks
+
+
+def test_try_acquire_stops_at_limit():
+    slots = ExportSlots(limit=2)
+    first, second = slots.try_acquire(), slots.try_acquire()
+    assert first is not None and second is not None
+    assert slots.try_acquire() is None
+    first()
+    assert slots.active == 1
+    assert slots.try_acquire() is not None
+
+
+def test_release_twice_frees_one_slot():
+    slots = ExportSlots(limit=2)
+    release = slots.try_acquire()
+    other = slots.try_acquire()
+    release()
+    release()
+    assert slots.active == 1
+    other()
+    assert slots.active == 0
+
+
+def exporting(slots, started, finished):
+    """The same wiring as /api/export/briefings: the body releases when it ends, the background task always."""
+    release = slots.try_acquire()
+
+    async def body():
+        started.append(True)
+        try:
+            yield b"{}\n"
+        finally:
+            release()
+            finished.append(True)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson", background=BackgroundTask(release))
+
+
+def serve(response, receive, send):
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    asyncio.run(asyncio.wait_for(response(scope, receive, send), timeout=5))
+
+
+def test_slot_released_once_after_full_stream():
+    slots, started, finished, sent = ExportSlots(limit=1), [], [], []
+
+    async def receive():
+        await asyncio.Event().wait()          # Client stays connected
+
+    async def send(message):
+        sent.append(message)
+
+    serve(exporting(slots, started, finished), receive, send)
+    assert started and finished
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+    assert slots.active == 0
+
+
+def test_slot_released_when_client_disconnects_before_first_chunk():
+    slots, started, finished = ExportSlots(limit=1), [], []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.Event().wait()          # Never gets past the response headers
+
+    serve(exporting(slots, started, finished), receive, send)
+    assert not started                        # The body's finally never ran...
+    assert slots.active == 0                  # ...but the background task gave the slot back
+    assert slots.try_acquire() is not None
+
+
+def test_ndjson_chunks_one_line_per_record():
+    async def batches():
+        yield [{"id": 1}, {"id": 2}]
+        yield []
+        yield [{"id": 3}]
+
+    async def collect():
+        return [chunk async for chunk in ndjson_chunks(batches())]
+
+    assert asyncio.run(collect()) == [b'{"id": 1}\n{"id": 2}\n', b'{"id": 3}\n']
@@ -0,0 +1,85 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.fingerprint import NearDuplicateIndex, simhash, hamming, to_signed64, to_unsigned64
+
+REPORT = (
+    "Chinese naval vessels conducted a second day of live fire drills east of the Taiwan Strait on Tuesday, "
+    "while the defence ministry in Taipei said it had tracked twenty one aircraft and nine ships operating "
+    "around the island. Analysts expect the exercises to continue through the week as Beijing signals its "
+    "displeasure at the transit of a foreign destroyer, and regional markets opened lower on the news. "
+    "The Japanese government raised the alert level for its southwestern islands and asked shipping "
+    "companies to avoid the declared exercise zones until further notice."
+)
+UNRELATED = (
+    "India and the European Union agreed on the final text of a free trade agreement covering tariffs on "
+    "automobiles, wine and pharmaceuticals, ending nearly two decades of stop and start negotiations. "
+    "Officials in New Delhi said ratification could take another year as member states review the deal."
+)
+
+
+def test_simhash_close_for_small_edits_far_for_unrelated_text():
+    edited = REPORT.replace("twenty one aircraft", "twenty two aircraft")
+    assert simhash(REPORT) == simhash(REPORT.upper())          # Case-insensitive
+    assert hamming(simhash(REPORT), simhash(edited)) <= 6
+    assert hamming(simhash(REPORT), simhash(UNRELATED)) > 16
+    assert simhash("") == 0
+
+
+def test_signed_roundtrip_fits_bigint():
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        signed = to_signed64(value)
+        assert -(1 << 63) <= signed < (1 << 63)
+        assert to_unsigned64(signed) == value
+
+
+def flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+@pytest.mark.parametrize("max_distance", [3, 6, 10])
+def test_bands_find_every_fingerprint_within_max_distance(max_distance):
+    # Pigeonhole: max_distance flipped bits can spoil at most max_distance of the max_distance + 1 bands
+    rng = random.Random(max_distance)
+    now = datetime.utcnow()
+    for _ in range(200):
+        index = NearDuplicateIndex(max_distance=max_distance)
+        original = rng.getrandbits(64)
+        index.add(1, original, now)
+        near = flip(original, rng.sample(range(64), rng.randint(0, max_distance)))
+        assert index.find(near, now=now) == 1
+        far = flip(original, rng.sample(range(64), max_distance + 1))
+        assert index.find(far, now=now) is None
+
+
+def test_find_returns_newest_match():
+    index = NearDuplicateIndex(max_distance=6)
+    now = datetime.utcnow()
+    index.add(1, 0b1010, now - timedelta(hours=2))
+    index.add(2, 0b1011, now - timedelta(hours=1))
+    index.add(3, (1 << 64) - 1, now)
+    assert index.find(0b1010, now=now) == 2
+
+
+def test_window_forgets_old_briefings():
+    index = NearDuplicateIndex(max_distance=6, window=timedelta(hours=24))
+    now = datetime.utcnow()
+    index.add(1, 12345, now - timedelta(hours=1))
+    assert index.find(12345, now=now) == 1
+    assert index.find(12345, now=now + timedelta(hours=24)) is None
+    assert not index._fingerprints
+
+
+def test_out_of_order_entries_are_age_checked():
+    # Eviction pops in insertion order, so an old entry behind a newer one is only filtered by find()
+    index = NearDuplicateIndex(max_distance=6, window=timedelta(hours=24))
+    now = datetime.utcnow()
+    index.add(1, 777, now)
+    index.add(2, 777, now - timedelta(hours=30))
+    assert index.find(777, now=now) == 1
+    index.add(1, (1 << 64) - 1, now)          # Already indexed: ignored
+    assert index.find((1 << 64) - 1, now=now) is None
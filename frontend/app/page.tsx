@@ -73,18 +73,31 @@ export default function Home() {
     }
   };
 
-  const handleSelectReport = (report: any) => {
+  const handleSelectReport = async (report: any) => {
     // When a user clicks an archived report, pull it up in the central chat view!
     setMessages([
       { role: "user", text: `RETRIEVE ARCHIVE ID: ${report.id.toString().padStart(4, '0')} [${report.topic}]` },
       { role: "chanakya", text: report.content }
     ]);
     setActiveLocations(report.locations || []);
-    
+    setForecast(null); // Clear forecast when selecting a new report
+
     // Also inject the historical scout/scholar context that generated this report!
-    if (report.scout_data) {
+    // It lives in compressed cold storage, so we only fetch it for the report actually opened.
+    let raw = report;
+    if (report.scout_data === undefined && report.scholar_data === undefined) {
+      try {
+        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/reports/${report.id}/raw`);
+        raw = await res.json();
+      } catch (e) {
+        console.error("Failed to load archived raw intel", e);
+        raw = {};
+      }
+    }
+
+    if (raw.scout_data) {
       try {
-        const parsedScout = JSON.parse(report.scout_data);
+        const parsedScout = JSON.parse(raw.scout_data);
         if (Array.isArray(parsedScout)) {
           setScoutFeed(parsedScout);
         }
@@ -95,12 +108,11 @@ export default function Home() {
         setScoutFeed([]); // Clear it if none exists
     }
 
-    if (report.scholar_data) {
-      setScholarFeed(report.scholar_data);
+    if (raw.scholar_data) {
+      setScholarFeed(raw.scholar_data);
     } else {
       setScholarFeed("");
     }
-    setForecast(null); // Clear forecast when selecting a new report
   };
 
   const runForecast = async () => {
@@ -112,13 +124,29 @@ export default function Home() {
     setForecast(null);
     
     try {
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/forecast`, {
+        // Scenarios arrive as NDJSON lines, each one AS SOON AS its LLM call finishes
+        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/forecast/stream`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({ context: lastAiMessage.text })
         });
-        const data = await response.json();
-        setForecast(data);
+        if (!response.body) throw new Error("Forecast stream unavailable");
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = "";
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split("\n");
+            buffered = lines.pop() ?? "";
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const { scenario, text, error } = JSON.parse(line);
+                if (error) throw new Error(error);
+                setForecast((prev: any) => ({ ...(prev ?? {}), [scenario]: text }));
+            }
+        }
     } catch (e) {
         console.error("Forecast failed:", e);
     } finally {
@@ -236,15 +264,15 @@ export default function Home() {
                     <h3 className="text-xs font-bold tracking-widest opacity-80 mb-2">SCENARIO FORECAST</h3>
                     <div className="p-3 border border-green-500/30 bg-green-500/10 rounded-lg">
                         <h4 className="font-bold text-green-400 mb-1">OPTIMISTIC</h4>
-                        <p className="opacity-80 leading-relaxed text-xs">{forecast.optimistic}</p>
+                        <p className="opacity-80 leading-relaxed text-xs">{forecast.optimistic ?? <span className="animate-pulse">Analyzing...</span>}</p>
                     </div>
                     <div className="p-3 border border-yellow-500/30 bg-yellow-500/10 rounded-lg">
                         <h4 className="font-bold text-yellow-400 mb-1">BASE CASE</h4>
-                        <p className="opacity-80 leading-relaxed text-xs">{forecast.base_case}</p>
+                        <p className="opacity-80 leading-relaxed text-xs">{forecast.base_case ?? <span className="animate-pulse">Analyzing...</span>}</p>
                     </div>
                     <div className="p-3 border border-red-500/30 bg-red-500/10 rounded-lg">
                         <h4 className="font-bold text-red-400 mb-1">PESSIMISTIC</h4>
-                        <p className="opacity-80 leading-relaxed text-xs">{forecast.pessimistic}</p>
+                        <p className="opacity-80 leading-relaxed text-xs">{forecast.pessimistic ?? <span className="animate-pulse">Analyzing...</span>}</p>
                     </div>
                 </div>
               )}
@@ -1,6 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
+import { useLiveFeed } from "./useLiveFeed";
 
 export interface Report {
   id: number;
@@ -37,16 +38,15 @@ export default function BriefingArchive({ onSelectReport }: BriefingArchiveProps
   useEffect(() => {
     // Initial fetch
     fetchReports();
-    
-    // Auto-polling (Background heartbeat every 15 seconds)
-    const intervalId = setInterval(() => {
-      fetchReports();
-    }, 15000);
-    
-    // Cleanup interval on dismount
-    return () => clearInterval(intervalId);
   }, []);
 
+  // Push instead of polling: the backend tells us when a new briefing lands,
+  // so we only hit /api/reports when something actually changed.
+  useLiveFeed({
+    onBriefing: () => fetchReports(),
+    onResync: () => fetchReports(),
+  });
+
   return (
     <section className="flex-1 glass-card rounded-lg p-4 flex flex-col mt-6 border-t border-terminal/30">
       <div className="flex justify-between items-center mb-4 opacity-70">
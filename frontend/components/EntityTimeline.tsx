@@ -1,4 +1,11 @@
 import { useEffect, useState } from "react";
+import { useLiveFeed, BriefingEvent } from "./useLiveFeed";
+
+const TYPE_TO_GROUP: Record<string, "people" | "organizations" | "countries"> = {
+  Person: "people",
+  Organization: "organizations",
+  Country: "countries",
+};
 
 export default function EntityTimeline() {
   const [entities, setEntities] = useState<{
@@ -9,22 +16,43 @@ export default function EntityTimeline() {
     people: [], organizations: [], countries: []
   });
 
+  const fetchEntities = async () => {
+    try {
+      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/entities`);
+      const data = await res.json();
+      setEntities(data);
+    } catch (e) {
+      console.error("Failed to fetch entities", e);
+    }
+  };
+
   useEffect(() => {
-    const fetchEntities = async () => {
-      try {
-        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/entities`);
-        const data = await res.json();
-        setEntities(data);
-      } catch (e) {
-        console.error("Failed to fetch entities", e);
-      }
-    };
-    
     fetchEntities();
-    const interval = setInterval(fetchEntities, 15000); // 15s polling to stay in sync with Autopilot
-    return () => clearInterval(interval);
   }, []);
 
+  // Apply the entity deltas from the live feed locally: +1 mention each, no refetch needed.
+  const applyDeltas = (event: BriefingEvent) => {
+    if (event.truncated) {
+      fetchEntities();
+      return;
+    }
+    setEntities((prev) => {
+      const next = { ...prev };
+      for (const ent of event.entities) {
+        const group = TYPE_TO_GROUP[ent.type];
+        if (!group) continue;
+        const existing = next[group].find((e) => e.id === ent.id);
+        next[group] = existing
+          ? next[group].map((e) => (e.id === ent.id ? { ...e, mentions: e.mentions + 1 } : e))
+          : [...next[group], { id: ent.id, name: ent.name, mentions: 1 }];
+        next[group].sort((a, b) => b.mentions - a.mentions);
+      }
+      return next;
+    });
+  };
+
+  useLiveFeed({ onBriefing: applyDeltas, onResync: fetchEntities });
+
   return (
     <div className="flex flex-col h-full">
       <h2 className="text-sm font-bold mb-4 opacity-70 flex items-center gap-2 shrink-0">
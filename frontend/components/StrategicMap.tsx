@@ -8,10 +8,13 @@ import "leaflet/dist/leaflet.css";
 import "leaflet-defaulticon-compatibility";
 import "leaflet-defaulticon-compatibility/dist/leaflet-defaulticon-compatibility.css";
 
-interface GeoResult {
-  lat: string;
-  lon: string;
-  display_name: string;
+interface MapMarker {
+  id: number;
+  name: string;
+  canonical_name: string | null;
+  lat: number;
+  lng: number;
+  briefing_ids: number[];
 }
 
 function MapUpdater({ markers }: { markers: { lat: number; lng: number }[] }) {
@@ -31,65 +34,46 @@ export default function StrategicMap({ locations }: { locations: string[] }) {
   const [markers, setMarkers] = useState<{ lat: number; lng: number; name: string }[]>([]);
 
   useEffect(() => {
-    // Geocode locations into coordinates using OpenStreetMap Nominatim API
-    const fetchCoords = async () => {
-      const newMarkers = [];
-      for (const loc of locations) {
-        try {
-          let lat = 0;
-          let lng = 0;
-          let success = false;
+    // Coordinates are geocoded and cached by the backend (Location table),
+    // so the whole map costs ONE local request instead of a Nominatim round trip per place.
+    const controller = new AbortController();
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
 
-          // Attempt 1: OpenStreetMap Nominatim (Good for Countries like 'USA')
-          try {
-            const res = await fetch(`https://nominatim.openstreetmap.org/search?format=json&q=${encodeURIComponent(loc)}&email=admin@projectchanakya.com`);
-            if (res.ok) {
-              const data = await res.json();
-              if (data && data.length > 0) {
-                lat = parseFloat(data[0].lat);
-                lng = parseFloat(data[0].lon);
-                success = true;
-              }
-            }
-          } catch (e) {
-            console.warn(`Nominatim failed for ${loc}, trying fallback...`);
-          }
-
-          // Attempt 2: Open-Meteo (Fallback: Good for cities/regions, Immune to CORS)
-          if (!success) {
-            try {
-              const res2 = await fetch(`https://geocoding-api.open-meteo.com/v1/search?name=${encodeURIComponent(loc)}&count=1&format=json`);
-              if (res2.ok) {
-                const data2 = await res2.json();
-                if (data2 && data2.results && data2.results.length > 0) {
-                  lat = data2.results[0].latitude;
-                  lng = data2.results[0].longitude;
-                  success = true;
-                }
-              }
-            } catch (e) {
-              console.error(`Both Geocoders failed for ${loc}`, e);
-            }
-          }
-
-          if (success) {
-            newMarkers.push({ lat, lng, name: loc });
-          }
-
-          // Respect Nominatim limits by waiting (1.5 req/sec)
-          await new Promise(resolve => setTimeout(resolve, 1500));
-        } catch (error) {
-          console.error(`Failed to geocode ${loc}`, error);
+    // Places the backend has not geocoded yet come back in "pending"; its backfill resolves
+    // about one per second, so poll a few times until they show up.
+    const fetchMarkers = async (attempt = 0) => {
+      try {
+        const params = new URLSearchParams();
+        locations.forEach((loc) => params.append("names", loc));
+        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/map?${params.toString()}`, {
+          signal: controller.signal,
+        });
+        if (!res.ok) return;
+        const data = await res.json();
+        setMarkers(
+          (data.markers || []).map((m: MapMarker) => ({ lat: m.lat, lng: m.lng, name: m.name }))
+        );
+        if ((data.pending || []).length > 0 && attempt < 5) {
+          retryTimer = setTimeout(() => fetchMarkers(attempt + 1), 3000);
+        }
+      } catch (error) {
+        if ((error as Error).name !== "AbortError") {
+          console.error("Failed to load map markers", error);
         }
       }
-      setMarkers(newMarkers);
     };
 
     if (locations && locations.length > 0) {
-      fetchCoords();
+      fetchMarkers();
     } else {
       setMarkers([]);
     }
+
+    // Cancel the in-flight request (and any pending retry) if the locations change before it returns
+    return () => {
+      controller.abort();
+      clearTimeout(retryTimer);
+    };
   }, [locations]);
 
   return (
@@ -0,0 +1,43 @@
+"use client";
+
+import { useEffect, useRef } from "react";
+
+export interface BriefingEvent {
+  type: "briefing_created";
+  id: number;
+  topic: string;
+  created_at: string;
+  locations: string[];
+  entities: { id: number; name: string; type: string }[];
+  truncated?: boolean;
+}
+
+interface LiveFeedHandlers {
+  onBriefing?: (event: BriefingEvent) => void;
+  // Fired when the server says we missed too much (or on first connect): refetch once.
+  onResync?: () => void;
+}
+
+/**
+ * Subscribes to the backend's Server-Sent Events feed.
+ * EventSource reconnects by itself and sends Last-Event-ID, so the backend replays
+ * anything we missed. No timers, no polling: an idle dashboard makes zero requests.
+ */
+export function useLiveFeed({ onBriefing, onResync }: LiveFeedHandlers) {
+  // Keep the latest handlers in a ref so the connection isn't torn down on every render
+  const handlers = useRef({ onBriefing, onResync });
+  handlers.current = { onBriefing, onResync };
+
+  useEffect(() => {
+    const source = new EventSource(`${process.env.NEXT_PUBLIC_API_URL}/api/feed/stream`);
+
+    source.addEventListener("briefing_created", (e) => {
+      handlers.current.onBriefing?.(JSON.parse((e as MessageEvent).data));
+    });
+    source.addEventListener("resync", () => {
+      handlers.current.onResync?.();
+    });
+
+    return () => source.close();
+  }, []);
+}